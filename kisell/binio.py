@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+from builtins import open
+import itertools
+import json
+import marshal
+import struct
+import zlib
+
+from . core import Error, Origin, Pipe
+
+
+MAGIC = b'KSLB\x01'
+_BLOCK = struct.Struct('<IIB')
+_NONE = 0
+_ZLIB = 1
+_CODECS = {None: _NONE, 'zlib': _ZLIB}
+
+
+class FormatError(Error):
+    """This exception is raised when a file is not in the binary record
+    format.
+    """
+
+    def __init__(self, name):
+        super(FormatError, self).__init__(
+            '\'{}\' is not a kisell binary record file'.format(name)
+        )
+
+
+def _write_header(f, field):
+    header = json.dumps(field).encode('utf-8')
+    f.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+
+def _write_block(f, records, compression=None, compresslevel=1):
+    raw = marshal.dumps(records, marshal.version)
+    if compression == 'zlib':
+        data = zlib.compress(raw, compresslevel)
+    else:
+        data = raw
+    f.write(_BLOCK.pack(len(raw), len(data), _CODECS[compression]))
+    f.write(data)
+
+
+def _read_header(f, name):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise FormatError(name)
+    (size,) = struct.unpack('<I', f.read(4))
+    return json.loads(f.read(size).decode('utf-8'))
+
+
+class BinaryFileWriter(Pipe):
+    """Write records to ``name`` in the binary record format. The file starts
+    with the ``field`` of the upstream, if any, followed by length-prefixed
+    blocks of ``block_size`` records serialized with ``marshal``, so records
+    must consist of builtin types such as lists, tuples, strings and numbers.
+    Blocks are optionally compressed. On each iteration, it consumes one
+    record and yields ``None``.
+
+    :param name: file name
+    :param block_size: number of records per block (default: 4096)
+    :param compression: ``None`` or ``'zlib'`` (default: None)
+    :param compresslevel: zlib compression level (default: 1)
+    """
+    def __init__(self, name, block_size=4096, compression=None,
+                 compresslevel=1):
+        if compression not in _CODECS:
+            raise ValueError(
+                'unknown compression \'{}\''.format(compression)
+            )
+        f = open(name, mode='wb')
+        super(BinaryFileWriter, self).__init__(f)
+        self.block_size = block_size
+        self.compression = compression
+        self.compresslevel = compresslevel
+        self.__file = f
+
+    def __write_block(self, records):
+        _write_block(self.__file, records, self.compression,
+                     self.compresslevel)
+
+    def _initialize(self):
+        try:
+            field = self.field
+        except AttributeError:
+            field = None
+        _write_header(self.__file, field)
+        block = []
+        try:
+            for x in self.upstream:
+                block.append(x)
+                if len(block) >= self.block_size:
+                    self.__write_block(block)
+                    block = []
+                yield None
+        finally:
+            if len(block) != 0:
+                self.__write_block(block)
+
+    def _finalize(self):
+        self.__file.close()
+
+
+class BinaryFileReader(Origin):
+    """Read records written by ``BinaryFileWriter``. The stored header is
+    exposed as ``field``. Each block is read into one reused buffer and
+    decoded from a ``memoryview`` of it without further copies.
+
+    :param name: file name
+    :param buffer_size: size of the file buffer (default: 1048576)
+    """
+
+    @classmethod
+    def __generator(cls, f):
+        return itertools.chain.from_iterable(cls.__blocks(f))
+
+    @classmethod
+    def __blocks(cls, f):
+        buf = bytearray()
+        while True:
+            head = f.read(_BLOCK.size)
+            if len(head) < _BLOCK.size:
+                break
+            (raw_size, size, codec) = _BLOCK.unpack(head)
+            if len(buf) < size:
+                buf = bytearray(size)
+            view = memoryview(buf)[:size]
+            f.readinto(view)
+            if codec == _ZLIB:
+                yield marshal.loads(zlib.decompress(view, 15, raw_size))
+            else:
+                yield marshal.loads(view)
+
+    def __init__(self, name, buffer_size=1048576):
+        f = open(name, mode='rb', buffering=buffer_size)
+        try:
+            self.field = _read_header(f, name)
+        except Exception:
+            f.close()
+            raise
+        super(BinaryFileReader, self).__init__(f, self.__class__.__generator)
+
+    def _finalize(self):
+        self.origin.close()
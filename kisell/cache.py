@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+from builtins import open, range
+import hashlib
+import os
+import types
+
+from . binio import BinaryFileReader, _write_block, _write_header
+from . core import Base, Error, Origin, Pipe
+from . util import walk
+
+
+class FingerprintError(Error):
+    """This exception is raised when the data of an origin cannot be
+    described, e.g. a generator or a stream which is not a regular file.
+    """
+
+    def __init__(self, origin):
+        super(FingerprintError, self).__init__(
+            'cannot fingerprint the origin {!r}'.format(origin)
+        )
+
+
+def _describable(value):
+    """return whether the data of the origin ``value`` is identified by its
+    fingerprint: a literal, a container of literals or a regular file.
+    """
+    if value is None or isinstance(value, (bool, int, float, str, bytes,
+                                           range)):
+        return True
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(_describable(x) for x in value)
+    if isinstance(value, dict):
+        return all(_describable(k) and _describable(v)
+                   for (k, v) in value.items())
+    name = getattr(value, 'name', None)
+    return isinstance(name, str) and os.path.isfile(name)
+
+
+def _global_names(code):
+    """return the names ``code`` and the code objects nested in it may look
+    up in the module globals.
+    """
+    res = set(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            res.update(_global_names(c))
+    return res
+
+
+def _fingerprint(value, h, depth=0):
+    """feed a deterministic description of ``value`` to the hash ``h``.
+    """
+    if depth > 8:
+        h.update(b'...')
+        return
+    h.update(type(value).__name__.encode('utf-8'))
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        h.update(repr(value).encode('utf-8'))
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) \
+            if isinstance(value, (set, frozenset)) else value
+        for x in items:
+            _fingerprint(x, h, depth + 1)
+    elif isinstance(value, dict):
+        for k in sorted(value, key=repr):
+            _fingerprint(k, h, depth + 1)
+            _fingerprint(value[k], h, depth + 1)
+    elif isinstance(value, types.FunctionType):
+        code = value.__code__
+        h.update(code.co_code)
+        _fingerprint(code.co_consts, h, depth + 1)
+        _fingerprint(code.co_names, h, depth + 1)
+        for cell in value.__closure__ or ():
+            _fingerprint(cell.cell_contents, h, depth + 1)
+        _fingerprint(value.__defaults__, h, depth + 1)
+        _fingerprint(value.__kwdefaults__, h, depth + 1)
+        for name in sorted(_global_names(code)):
+            if name in value.__globals__:
+                h.update(name.encode('utf-8'))
+                _fingerprint(value.__globals__[name], h, depth + 1)
+    elif isinstance(value, types.MethodType):
+        _fingerprint(value.__func__, h, depth + 1)
+    elif isinstance(value, types.BuiltinFunctionType):
+        name = getattr(value, '__qualname__', value.__name__)
+        h.update(name.encode('utf-8'))
+    elif isinstance(value, types.CodeType):
+        h.update(value.co_code)
+        _fingerprint(value.co_consts, h, depth + 1)
+    elif isinstance(value, Base):
+        h.update(b'stage')
+    elif isinstance(getattr(value, 'name', None), str) and \
+            os.path.isfile(value.name):
+        st = os.stat(value.name)
+        _fingerprint((os.path.abspath(value.name), st.st_size, st.st_mtime),
+                     h, depth + 1)
+    elif type(value).__repr__ is not object.__repr__ and \
+            ' at 0x' not in repr(value):
+        h.update(repr(value).encode('utf-8'))
+    elif hasattr(value, '__dict__'):
+        _fingerprint(vars(value), h, depth + 1)
+
+
+def fingerprint(stream):
+    """return the hex digest which identifies ``stream``: the classes and the
+    parameters of it and its upstreams, and the size and the modification
+    time of the files they read. raise ``FingerprintError`` if an origin is
+    neither literal data nor a regular file.
+
+    :param stream: instance of ``kisell.core.Base``
+    """
+    h = hashlib.sha1()
+    for s in walk(stream):
+        cls = type(s)
+        h.update('{}.{}'.format(cls.__module__, cls.__name__).encode('utf-8'))
+        _fingerprint(dict(
+            (k, v) for (k, v) in vars(s).items() if not k.startswith('_')
+        ), h)
+        if isinstance(s, Origin) and not isinstance(s.origin, Base):
+            if not _describable(s.origin):
+                raise FingerprintError(s.origin)
+            _fingerprint(s.origin, h)
+    return h.hexdigest()
+
+
+class Cache(Pipe):
+    """Save the records of the upstream under the directory ``path`` in the
+    format of ``kisell.binio`` on the first run, and replay them on the later
+    runs without iterating the upstream. The entry is keyed by
+    ``fingerprint`` of the upstream. Entries are only stored when the
+    upstream is exhausted; the least recently used ones are removed while
+    the directory is larger than ``max_size`` bytes. ``.hit`` attribute
+    indicates whether the records are replayed. If the upstream cannot be
+    fingerprinted (see ``FingerprintError``), records are passed through
+    without being cached and ``.entry`` is None.
+
+    :param path: cache directory
+    :param max_size: maximum total size of the entries in bytes\
+    (default: 1073741824)
+    :param block_size: number of records per block (default: 4096)
+    :param compression: ``None`` or ``'zlib'`` (default: None)
+    """
+    suffix = '.kbin'
+
+    def __init__(self, path, max_size=1 << 30, block_size=4096,
+                 compression=None):
+        super(Cache, self).__init__()
+        self.path = path
+        self.max_size = max_size
+        self.block_size = block_size
+        self.compression = compression
+        self.__entry = None
+        self.__reader = None
+
+    @property
+    def entry(self):
+        """file name of the entry for the current upstream.
+        """
+        if self.__entry is None:
+            try:
+                key = fingerprint(self.upstream)
+            except FingerprintError:
+                self.__entry = False
+            else:
+                self.__entry = os.path.join(self.path, key + self.suffix)
+        return self.__entry or None
+
+    @property
+    def hit(self):
+        return self.__reader is not None or (
+            self.entry is not None and os.path.isfile(self.entry)
+        )
+
+    @property
+    def field(self):
+        if self.__reader is None and self.hit:
+            self.__reader = BinaryFileReader(self.entry)
+        if self.__reader is not None:
+            return self.__reader.field
+        return self.upstream.field
+
+    def __replay(self):
+        os.utime(self.entry, None)
+        for x in self.__reader:
+            yield x
+
+    def __store(self):
+        try:
+            field = self.upstream.field
+        except AttributeError:
+            field = None
+        tmp = '{}.{}.tmp'.format(self.entry, os.getpid())
+        completed = False
+        f = open(tmp, mode='wb')
+        try:
+            _write_header(f, field)
+            block = []
+            for x in self.upstream:
+                block.append(x)
+                if len(block) >= self.block_size:
+                    _write_block(f, block, self.compression)
+                    block = []
+                yield x
+            if len(block) != 0:
+                _write_block(f, block, self.compression)
+            completed = True
+        finally:
+            f.close()
+            if completed:
+                os.rename(tmp, self.entry)
+                self.__evict()
+            else:
+                os.remove(tmp)
+
+    def __evict(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(self.suffix):
+                st = os.stat(os.path.join(self.path, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        entries.sort()
+        total = sum(size for (_, size, _) in entries)
+        for (_, size, name) in entries:
+            if total <= self.max_size:
+                break
+            path = os.path.join(self.path, name)
+            if path != self.entry:
+                os.remove(path)
+                total -= size
+
+    def _initialize(self):
+        if self.entry is None:
+            return self.upstream
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        if self.hit:
+            self.field
+            return self.__replay()
+        return self.__store()
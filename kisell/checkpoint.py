@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from builtins import open
+import os
+import pickle
+
+from . util import walk
+
+
+class Checkpoint(object):
+    """Run a pipeline saving the states of its stages to ``path`` every
+    ``every`` records, and resume it from the last saved states when ``path``
+    exists. On success ``path`` is removed.
+
+    The states are taken between two records of the pipeline, through
+    ``_get_state`` of each stage, and restored before the initialization
+    through ``_set_state``. ``FileReadStream`` saves its position and is
+    sought back to it, ``FileWriteStream`` flushes and saves its position and
+    is truncated to it, which needs ``resume=True`` so that the file is not
+    truncated on construction, and ``DSVParse``, ``DSVFormat``, ``Count``
+    and ``Accumulate`` save what they need to go on, so a ``DSVFileReader``
+    -> ... -> ``DSVFileWriter(..., resume=True)`` pipeline continues from
+    the last checkpoint as if it had not stopped. Stages which read ahead of
+    their downstream, such as ``Prefetch``, make the saved states
+    inconsistent.
+
+    :param path: file name of the checkpoint
+    :param every: number of records between checkpoints (default: 100000)
+    """
+    def __init__(self, path, every=100000):
+        self.path = path
+        self.every = every
+        self.records = 0
+
+    def load(self):
+        """return the saved checkpoint as a dict, or None if there is none.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, stages):
+        """save the states of ``stages``.
+
+        :param stages: list of stages of the pipeline
+        """
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump({
+                'stages': [type(s).__name__ for s in stages],
+                'states': [s._get_state() for s in stages],
+                'records': self.records
+            }, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp, self.path)
+
+    def run(self, pipeline):
+        """run ``pipeline`` to the end and return it. ``.records`` attribute
+        indicates the number of records the pipeline has yielded, including
+        those before the restored checkpoint.
+
+        :param pipeline: the last stage of a pipeline which is not initialized
+        """
+        stages = list(walk(pipeline))
+        saved = self.load()
+        if saved is None:
+            states = [None] * len(stages)
+            self.records = 0
+        else:
+            if saved['stages'] != [type(s).__name__ for s in stages]:
+                raise ValueError(
+                    'checkpoint \'{}\' does not match the pipeline'.format(
+                        self.path
+                    )
+                )
+            states = saved['states']
+            self.records = saved['records']
+        for (s, state) in zip(stages, states):
+            s._set_state(state)
+        for _ in pipeline:
+            self.records += 1
+            if self.records % self.every == 0:
+                self.save(stages)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return pipeline
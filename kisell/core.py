@@ -2,6 +2,7 @@
 
 from collections import Iterable
 from abc import ABCMeta, abstractmethod
+import types
 
 from future.utils import with_metaclass
 
@@ -33,6 +34,10 @@ class OriginWithUpstreamError(Error):
 class Base(Iterable, with_metaclass(ABCMeta)):
     """Base stream class
     """
+    # True if ``_initialize`` and ``_finalize`` of the upstream are not
+    # called with those of this instance, e.g. because the upstream runs in
+    # another process.
+    _detached_upstream = False
 
     def __init__(self):
         """Initialize Base instance
@@ -85,15 +90,20 @@ class Base(Iterable, with_metaclass(ABCMeta)):
         """private method which is called when the stream is initialized.
         """
         if self.__stream is None:
-            if self.upstream is not None:
+            if self.upstream is not None and not self._detached_upstream:
                 self.upstream.__initialize()
             self.__stream = self._initialize()
 
     def __finalize(self):
-        """private method which is called when the stream is finalized.
+        """private method which is called when the stream is finalized. the
+        stream of this instance is closed first if it is a generator, so that
+        a downstream which stops early also stops all its upstreams.
         """
         if self.__alive:
-            if self.upstream is not None:
+            self.__alive = False
+            if isinstance(self.__stream, types.GeneratorType):
+                self.__stream.close()
+            if self.upstream is not None and not self._detached_upstream:
                 self.upstream.__finalize()
             self.__alive = self._finalize()
 
@@ -109,12 +119,29 @@ class Base(Iterable, with_metaclass(ABCMeta)):
         """
         pass
 
+    def _get_state(self):
+        """return the picklable state of this instance to be saved by
+        ``kisell.checkpoint.Checkpoint``, or None if it has no state.
+        """
+        return None
+
+    def _set_state(self, state):
+        """restore ``state`` returned by ``_get_state``. It is called before
+        the initialization, with None when there is nothing to restore.
+
+        :param state: state or None
+        """
+        pass
+
     def __iter__(self):
-        """return stream
+        """return stream. the stream is finalized when the iteration ends,
+        fails or is closed.
         """
-        for x in self.stream:
-            yield x
-        self.__finalize()
+        try:
+            for x in self.stream:
+                yield x
+        finally:
+            self.__finalize()
 
     def __call__(self):
         """just run the iteration
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+from builtins import open
+import json
+import os
+import shutil
+
+import numpy
+from numpy.lib import format as npy_format
+
+from .. core import Origin, Pipe
+from . operator import _ResolveTargetField
+
+MANIFEST = 'manifest.json'
+
+
+def _dtypes(dtype, names):
+    if isinstance(dtype, dict):
+        res = [numpy.dtype(dtype.get(n, float)) for n in names]
+    else:
+        res = [numpy.dtype(dtype)] * len(names)
+    for (n, d) in zip(names, res):
+        if d.hasobject or d.itemsize == 0:
+            raise ValueError(
+                'column \'{}\' needs a fixed-size dtype, not {}'.format(n, d)
+            )
+    return res
+
+
+class NpyColumnWriter(Pipe, _ResolveTargetField):
+    """Write the ``target_field`` columns of the records to ``directory`` as
+    one ``.npy`` file per column, named after the ``field`` of the upstream,
+    together with ``manifest.json`` which lists the columns, their dtypes and
+    the number of rows. Values are buffered per column and appended to raw
+    temporary files; the ``.npy`` headers are written once the number of rows
+    is known. On each iteration, it consumes one record and yields ``None``.
+
+    :param directory: output directory. made if it does not exist.
+    :param target_field: field name, field index, regular expression or\
+    tuple of them (default: all fields)
+    :param dtype: fixed-size dtype of the columns, or dict which maps field\
+    names to dtypes (default: float)
+    :param buffer_size: number of records buffered per column\
+    (default: 65536)
+    """
+    def __init__(self, directory, target_field=None, dtype=float,
+                 buffer_size=65536):
+        super(NpyColumnWriter, self).__init__()
+        self.directory = directory
+        self.target_field = target_field
+        self.dtype = dtype
+        self.buffer_size = buffer_size
+        self.rows = 0
+        self.__files = []
+
+    def __path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _initialize(self):
+        field = self.field
+        if self.target_field is None:
+            indices = list(range(len(field)))
+        else:
+            indices = sorted(
+                self._resolve_target_field(field, self.target_field)
+            )
+        names = [field[i] for i in indices]
+        dtypes = _dtypes(self.dtype, names)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        self.__files = [
+            open(self.__path(n + '.npy.tmp'), mode='wb') for n in names
+        ]
+        buffers = [[] for _ in indices]
+        self.rows = 0
+        for x in self.upstream:
+            for (buf, i) in zip(buffers, indices):
+                buf.append(x[i])
+            self.rows += 1
+            if len(buffers[0]) >= self.buffer_size:
+                self.__flush(buffers, dtypes)
+            yield None
+        self.__flush(buffers, dtypes)
+        for (f, n, d) in zip(self.__files, names, dtypes):
+            f.close()
+            self.__finish(n, d)
+        self.__files = []
+        with open(self.__path(MANIFEST), mode='w') as f:
+            json.dump({
+                'field': names,
+                'dtype': [npy_format.dtype_to_descr(d) for d in dtypes],
+                'rows': self.rows
+            }, f)
+
+    def __flush(self, buffers, dtypes):
+        for (f, buf, d) in zip(self.__files, buffers, dtypes):
+            if len(buf) != 0:
+                numpy.array(buf, dtype=d).tofile(f)
+                del buf[:]
+
+    def __finish(self, name, dtype):
+        tmp = self.__path(name + '.npy.tmp')
+        with open(self.__path(name + '.npy'), mode='wb') as f:
+            npy_format.write_array_header_1_0(f, {
+                'descr': npy_format.dtype_to_descr(dtype),
+                'fortran_order': False,
+                'shape': (self.rows,)
+            })
+            with open(tmp, mode='rb') as g:
+                shutil.copyfileobj(g, f, 1 << 20)
+        os.remove(tmp)
+
+    def _finalize(self):
+        while len(self.__files) != 0:
+            f = self.__files.pop()
+            f.close()
+            os.remove(f.name)
+
+
+class NpyColumnReader(Origin):
+    """Read columns written by ``NpyColumnWriter``. The files are opened with
+    ``numpy.load(mmap_mode='r')`` and the selected column names are exposed
+    as ``field``. Without ``batch_size`` it yields each row as a list;
+    otherwise it yields lists of array views of ``batch_size`` rows, one per
+    column.
+
+    :param directory: directory written by ``NpyColumnWriter``
+    :param target_field: field name, field index, regular expression or\
+    tuple of them (default: all fields)
+    :param batch_size: number of rows per batch (default: None)
+    """
+
+    @staticmethod
+    def __rows(columns, rows):
+        for start in range(0, rows, 65536):
+            chunk = [c[start:start + 65536].tolist() for c in columns]
+            for x in zip(*chunk):
+                yield list(x)
+
+    @staticmethod
+    def __batches(columns, rows, batch_size):
+        for start in range(0, rows, batch_size):
+            yield [c[start:start + batch_size] for c in columns]
+
+    def __init__(self, directory, target_field=None, batch_size=None):
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        names = manifest['field']
+        rows = manifest['rows']
+        if target_field is None:
+            indices = list(range(len(names)))
+        else:
+            indices = sorted(_ResolveTargetField()._resolve_target_field(
+                names, target_field
+            ))
+        self.field = [names[i] for i in indices]
+        self.rows = rows
+        self.batch_size = batch_size
+        columns = [
+            numpy.load(os.path.join(directory, n + '.npy'),
+                       mmap_mode='r' if rows != 0 else None)
+            for n in self.field
+        ]
+        super(NpyColumnReader, self).__init__(
+            columns, lambda c: self.__generate(c)
+        )
+
+    def __generate(self, columns):
+        if self.batch_size is None:
+            return self.__rows(columns, self.rows)
+        return self.__batches(columns, self.rows, self.batch_size)
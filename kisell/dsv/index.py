@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+
+class DSVIndex(object):
+    """Byte offsets of every ``every``-th record of a DSV file. The index is
+    saved next to the file as ``name + '.kidx'`` and is valid only while the
+    size and the modification time of the file are unchanged. Record ``0`` is
+    the first record after the header.
+
+    :param name: file name
+    :param every: interval of indexed records
+    :param offsets: byte offsets of records ``0, every, 2 * every, ...``
+    :param records: number of records in the file
+    :param size: size of the file when the index was built
+    :param mtime: modification time of the file when the index was built
+    """
+    suffix = '.kidx'
+
+    def __init__(self, name, every, offsets, records, size, mtime):
+        self.name = name
+        self.every = every
+        self.offsets = offsets
+        self.records = records
+        self.size = size
+        self.mtime = mtime
+
+    @classmethod
+    def build(cls, name, every=10000, quotechar='"', save=True):
+        """scan ``name`` and return its index. Records may contain quoted
+        line breaks.
+
+        :param name: file name
+        :param every: interval of indexed records (default: 10000)
+        :param quotechar: quote character (default: ``"``)
+        :param save: save the index to the sidecar file (default: True)
+        """
+        st = os.stat(name)
+        q = quotechar.encode('ascii')
+        offsets = []
+        records = -1
+        pos = 0
+        in_quote = False
+        with open(name, 'rb') as f:
+            for line in f:
+                if not in_quote:
+                    if records >= 0 and records % every == 0:
+                        offsets.append(pos)
+                    records += 1
+                if line.count(q) % 2 == 1:
+                    in_quote = not in_quote
+                pos += len(line)
+        res = cls(name, every, offsets, max(records, 0), st.st_size,
+                  st.st_mtime)
+        if save:
+            res.save()
+        return res
+
+    @classmethod
+    def load(cls, name):
+        """return the saved index of ``name``, or ``None`` if there is none
+        or the file has changed since it was built.
+
+        :param name: file name
+        """
+        try:
+            with open(name + cls.suffix, 'r') as f:
+                d = json.load(f)
+            res = cls(name, d['every'], d['offsets'], d['records'],
+                      d['size'], d['mtime'])
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+        return res if res.is_valid() else None
+
+    def is_valid(self):
+        """return whether the file is unchanged since the index was built.
+        """
+        try:
+            st = os.stat(self.name)
+        except OSError:
+            return False
+        return st.st_size == self.size and st.st_mtime == self.mtime
+
+    def save(self):
+        with open(self.name + self.suffix, 'w') as f:
+            json.dump({
+                'every': self.every, 'offsets': self.offsets,
+                'records': self.records, 'size': self.size,
+                'mtime': self.mtime
+            }, f)
+
+    def locate(self, record):
+        """return ``(indexed_record, offset)`` of the last indexed record not
+        after ``record``.
+
+        :param record: record number
+        """
+        if record <= 0 or len(self.offsets) == 0:
+            return (0, self.offsets[0] if len(self.offsets) != 0 else None)
+        i = min(record // self.every, len(self.offsets) - 1)
+        return (i * self.every, self.offsets[i])
+
+    def split(self, n):
+        """split the records into at most ``n`` ranges starting at indexed
+        records and return the list of ``(skip, limit)``.
+
+        :param n: number of ranges
+        """
+        starts = sorted(set(
+            self.locate(self.records * i // n)[0] for i in range(n)
+        ))
+        ends = starts[1:] + [self.records]
+        return [(s, e - s) for (s, e) in zip(starts, ends) if e > s]
@@ -1,11 +1,28 @@
 # -*- coding: utf-8 -*-
 
+from builtins import open
+from collections import OrderedDict
 from io import StringIO
 import csv
 
-from .. core import Pipe
+from .. core import Error, Origin, Pipe
 from .. util import CompoOrigin, CompoPipe
-from .. io import FileReadStream, FileWriteStream
+from .. io import FileReadStream, FileWriteStream, MultiFileReadStream
+from . index import DSVIndex
+from . operator import _ResolveTargetField
+
+
+class HeaderMismatchError(Error):
+    """This exception is raised when files read as one stream have different
+    headers.
+    """
+
+    def __init__(self, name, expected, actual):
+        super(HeaderMismatchError, self).__init__(
+            'header of \'{}\' is {!r}, expected {!r}'.format(
+                name, actual, expected
+            )
+        )
 
 
 class DSVParse(Pipe):
@@ -33,9 +50,17 @@ class DSVParse(Pipe):
         s = csv.reader(self.upstream, delimiter=self.delimiter,
                        lineterminator=self.lineterminator,
                        dialect=self.dialect, **self.kwargs)
-        self.__field = next(s)
+        if self.__field is None:
+            self.__field = next(s)
         return s
 
+    def _get_state(self):
+        return self.__field
+
+    def _set_state(self, state):
+        if state is not None:
+            self.__field = state
+
 
 class CSVParse(DSVParse):
     """CSV parse string upstream
@@ -61,6 +86,7 @@ class DSVFormat(Pipe):
         self.lineterminator = lineterminator
         self.dialect = dialect
         self.kwargs = kwargs
+        self.__header_written = False
 
     def _initialize(self):
         string_out = StringIO()
@@ -68,9 +94,11 @@ class DSVFormat(Pipe):
                             lineterminator=self.lineterminator,
                             dialect=self.dialect, **self.kwargs)
         try:
-            writer.writerow(self.field)
-            string_out.seek(0)
-            yield string_out.read()
+            if not self.__header_written:
+                writer.writerow(self.field)
+                self.__header_written = True
+                string_out.seek(0)
+                yield string_out.read()
         except AttributeError as e:
             pass
         for x in self.upstream:
@@ -85,6 +113,12 @@ class DSVFormat(Pipe):
             string_out.seek(pos)
             yield string_out.read()
 
+    def _get_state(self):
+        return self.__header_written
+
+    def _set_state(self, state):
+        self.__header_written = bool(state)
+
 
 class CSVFormat(DSVFormat):
     def __init__(self):
@@ -96,6 +130,116 @@ class TSVFormat(DSVFormat):
         super(TSVFormat, self).__init__('\t', '\n', 'excel')
 
 
+class LazyRecord(object):
+    """Record whose fields are held as ``bytes`` and decoded on first access.
+    Indexing, slicing and iteration return decoded strings.
+
+    :param fields: list of ``bytes``
+    :param encoding: encoding of the fields
+    """
+    __slots__ = ('fields', 'encoding')
+
+    def __init__(self, fields, encoding):
+        self.fields = fields
+        self.encoding = encoding
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.fields)))]
+        v = self.fields[i]
+        if isinstance(v, bytes):
+            v = self.fields[i] = v.decode(self.encoding)
+        return v
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __iter__(self):
+        for i in range(len(self.fields)):
+            yield self[i]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'LazyRecord({!r})'.format(list(self))
+
+
+class BytesDSVParse(Pipe):
+    """Parse ``bytes`` lines, e.g. from ``FileReadStream`` in binary mode.
+    Lines are split as bytes; an ASCII line is decoded at once and a
+    non-ASCII line becomes a ``LazyRecord`` which decodes only the fields
+    that are accessed. Records with the quote character go through ``csv``.
+    ``encoding`` must be ASCII compatible and must not use the delimiter,
+    the quote character or line breaks as bytes of multi-byte characters.
+
+    :param delimiter: delimiter
+    :param encoding: encoding (default: utf-8)
+    :param quotechar: quote character (default: ``"``)
+    """
+    def __init__(self, delimiter, encoding='utf-8', quotechar='"', **kwargs):
+        super(BytesDSVParse, self).__init__()
+        for c in (delimiter, quotechar, '\n', '\r'):
+            if c.encode(encoding) != c.encode('ascii'):
+                raise ValueError(
+                    'encoding \'{}\' is not ASCII compatible'.format(
+                        encoding
+                    )
+                )
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.quotechar = quotechar
+        self.kwargs = kwargs
+        self.__field = None
+
+    @property
+    def field(self):
+        if self.__field is not None:
+            return self.__field
+        if self.upstream is None:
+            return None
+        self.stream
+        return self.__field
+
+    def __parse(self, line, it):
+        q = self.quotechar.encode('ascii')
+        while line.count(q) % 2 == 1:
+            following = next(it, None)
+            if following is None:
+                break
+            line += following
+        return next(csv.reader([line.decode(self.encoding)],
+                               delimiter=self.delimiter,
+                               quotechar=self.quotechar, **self.kwargs), [])
+
+    def __records(self, it):
+        encoding = self.encoding
+        delimiter = self.delimiter
+        bdelimiter = delimiter.encode('ascii')
+        q = self.quotechar.encode('ascii')
+        for line in it:
+            if q in line:
+                yield self.__parse(line, it)
+                continue
+            line = line.rstrip(b'\r\n')
+            if len(line) == 0:
+                yield []
+                continue
+            try:
+                yield line.decode('ascii').split(delimiter)
+            except UnicodeDecodeError:
+                yield LazyRecord(line.split(bdelimiter), encoding)
+
+    def _initialize(self):
+        it = iter(self.upstream)
+        line = next(it, None)
+        self.__field = [] if line is None else self.__parse(line, it)
+        return self.__records(it)
+
+
 class DSVFileReader(CompoOrigin):
     def __init__(self, name, delimiter, encoding='utf-8', lineterminator=None,
                  dialect=None, **kwargs):
@@ -103,6 +247,26 @@ class DSVFileReader(CompoOrigin):
             FileReadStream(name, encoding),
             DSVParse(delimiter, lineterminator, dialect, **kwargs)
         )
+        self.__name = name
+
+    def seek_record(self, record):
+        """move to the last indexed record not after ``record`` by the
+        sidecar ``kisell.dsv.index.DSVIndex`` of the file, if it is valid.
+        return the number of records skipped. ``kisell.operator.Skip`` calls
+        this when it directly follows the reader.
+
+        :param record: record number
+        """
+        index = DSVIndex.load(self.__name)
+        if index is None:
+            return 0
+        (skipped, offset) = index.locate(record)
+        if skipped == 0:
+            return 0
+        parse = self.origin
+        parse.field
+        parse.upstream.origin.seek(offset)
+        return skipped
 
 
 class CSVFileReader(DSVFileReader):
@@ -116,21 +280,244 @@ class TSVFileReader(DSVFileReader):
                                             'excel')
 
 
+class MultiDSVFileReader(Origin):
+    """Read several DSV files as one stream of records. All files must have
+    the same header, which is exposed as ``field``; the headers of the files
+    after the first are dropped. The files are read ahead on a background
+    thread by ``kisell.io.MultiFileReadStream``.
+
+    :param names: list of file names or a glob pattern
+    :param delimiter: delimiter
+    :param encoding: file encoding (default: utf-8)
+    :param readahead: maximum number of batches read ahead (default: 16)
+    """
+    def __init__(self, names, delimiter, encoding='utf-8',
+                 lineterminator=None, dialect=None, readahead=16, **kwargs):
+        super(MultiDSVFileReader, self).__init__(
+            MultiFileReadStream(names, encoding, readahead)
+        )
+        self.delimiter = delimiter
+        self.lineterminator = lineterminator
+        self.dialect = dialect
+        self.kwargs = kwargs
+        self.__field = None
+
+    @property
+    def field(self):
+        if self.__field is None:
+            self.stream
+        return self.__field
+
+    def __reader(self, lines):
+        return csv.reader(lines, delimiter=self.delimiter,
+                          lineterminator=self.lineterminator,
+                          dialect=self.dialect, **self.kwargs)
+
+    def __records(self, first, files):
+        for x in first:
+            yield x
+        for (name, lines) in files:
+            s = self.__reader(lines)
+            header = next(s, None)
+            if header is not None and header != self.__field:
+                raise HeaderMismatchError(name, self.__field, header)
+            for x in s:
+                yield x
+
+    def _initialize(self):
+        files = self.origin.files()
+        for (name, lines) in files:
+            s = self.__reader(lines)
+            self.__field = next(s, None)
+            if self.__field is not None:
+                return self.__records(s, files)
+        self.__field = []
+        return iter(())
+
+    def _finalize(self):
+        self.origin._finalize()
+
+
+class MultiCSVFileReader(MultiDSVFileReader):
+    def __init__(self, names, encoding='utf-8', readahead=16):
+        super(MultiCSVFileReader, self).__init__(
+            names, ',', encoding, '\n', 'excel', readahead
+        )
+
+
+class MultiTSVFileReader(MultiDSVFileReader):
+    def __init__(self, names, encoding='utf-8', readahead=16):
+        super(MultiTSVFileReader, self).__init__(
+            names, '\t', encoding, '\n', 'excel', readahead
+        )
+
+
+class BytesDSVFileReader(CompoOrigin):
+    """Read a DSV file in binary mode through ``BytesDSVParse``.
+    """
+    def __init__(self, name, delimiter, encoding='utf-8', quotechar='"',
+                 **kwargs):
+        super(BytesDSVFileReader, self).__init__(
+            FileReadStream(name, binary=True),
+            BytesDSVParse(delimiter, encoding, quotechar, **kwargs)
+        )
+
+
+class BytesCSVFileReader(BytesDSVFileReader):
+    def __init__(self, name, encoding='utf-8'):
+        super(BytesCSVFileReader, self).__init__(name, ',', encoding)
+
+
+class BytesTSVFileReader(BytesDSVFileReader):
+    def __init__(self, name, encoding='utf-8'):
+        super(BytesTSVFileReader, self).__init__(name, '\t', encoding)
+
+
 class DSVFileWriter(CompoPipe):
     def __init__(self, name, delimiter, encoding='utf-8', lineterminator=None,
-                 dialect=None, **kwargs):
+                 dialect=None, resume=False, **kwargs):
         super(DSVFileWriter, self).__init__(
             DSVFormat(delimiter, lineterminator, dialect, **kwargs),
-            FileWriteStream(name, encoding, lineterminator='')
+            FileWriteStream(name, encoding, lineterminator='', resume=resume)
         )
 
 
 class CSVFileWriter(DSVFileWriter):
-    def __init__(self, name, encoding='utf-8'):
-        super(CSVFileWriter, self).__init__(name, ',', encoding, '\n', 'excel')
+    def __init__(self, name, encoding='utf-8', resume=False):
+        super(CSVFileWriter, self).__init__(name, ',', encoding, '\n', 'excel',
+                                            resume)
 
 
 class TSVFileWriter(DSVFileWriter):
-    def __init__(self, name, encoding='utf-8'):
+    def __init__(self, name, encoding='utf-8', resume=False):
         super(TSVFileWriter, self).__init__(name, '\t', encoding, '\n',
-                                            'excel')
+                                            'excel', resume)
+
+
+class PartitionedDSVFileWriter(Pipe, _ResolveTargetField):
+    """Write each record to the file of its partition. The partition of a
+    record is the value of its ``target_field`` (a tuple of values when
+    several fields match) or the return value of ``key``. Each file starts
+    with the header. Records are buffered per partition and at most
+    ``max_open`` files are kept open; the least recently used one is closed
+    first and reopened in append mode when it is needed again. On each
+    iteration, it consumes one record and yields ``None``.
+
+    :param name: format string such as ``'out_{}.csv'`` or one-argument\
+    function which takes the partition and returns the file name
+    :param delimiter: delimiter
+    :param target_field: field name, field index, regular expression or\
+    tuple of them.
+    :param key: one-argument function which takes a record and returns its\
+    partition. used instead of ``target_field``.
+    :param encoding: file encoding (default: utf-8)
+    :param max_open: maximum number of open files (default: 256)
+    :param buffer_size: number of records buffered per partition\
+    (default: 1024)
+    """
+    def __init__(self, name, delimiter, target_field=None, key=None,
+                 encoding='utf-8', lineterminator=None, dialect=None,
+                 max_open=256, buffer_size=1024, **kwargs):
+        super(PartitionedDSVFileWriter, self).__init__()
+        if (target_field is None) == (key is None):
+            raise ValueError(
+                'exactly one of target_field and key must be specified'
+            )
+        self.name = name
+        self.delimiter = delimiter
+        self.target_field = target_field
+        self.key = key
+        self.encoding = encoding
+        self.lineterminator = lineterminator
+        self.dialect = dialect
+        self.max_open = max_open
+        self.buffer_size = buffer_size
+        self.kwargs = kwargs
+        self.partitions = set()
+        self.__header = None
+        self.__buffers = {}
+        self.__handles = OrderedDict()
+
+    def __construct_key(self):
+        if self.key is not None:
+            return self.key
+        return self._construct_key()
+
+    def __filename(self, partition):
+        if callable(self.name):
+            return self.name(partition)
+        if isinstance(partition, tuple):
+            return self.name.format(*partition)
+        return self.name.format(partition)
+
+    def __writer(self, partition):
+        if partition in self.__handles:
+            handle = self.__handles.pop(partition)
+            self.__handles[partition] = handle
+            return handle[1]
+        if len(self.__handles) >= self.max_open:
+            self.__handles.popitem(last=False)[1][0].close()
+        if partition in self.partitions:
+            f = open(self.__filename(partition), encoding=self.encoding,
+                     mode='a', newline='')
+        else:
+            f = open(self.__filename(partition), encoding=self.encoding,
+                     mode='w', newline='')
+        writer = csv.writer(f, delimiter=self.delimiter,
+                            lineterminator=self.lineterminator,
+                            dialect=self.dialect, **self.kwargs)
+        if partition not in self.partitions:
+            self.partitions.add(partition)
+            if self.__header is not None:
+                writer.writerow(self.__header)
+        self.__handles[partition] = (f, writer)
+        return writer
+
+    def __flush(self, partition):
+        buf = self.__buffers.pop(partition)
+        self.__writer(partition).writerows(buf)
+
+    def __flush_all(self):
+        for partition in list(self.__buffers.keys()):
+            self.__flush(partition)
+
+    def _initialize(self):
+        try:
+            self.__header = self.field
+        except AttributeError:
+            pass
+        kf = self.__construct_key()
+        buffers = self.__buffers
+        for x in self.upstream:
+            k = kf(x)
+            buf = buffers.get(k)
+            if buf is None:
+                buf = buffers[k] = []
+            buf.append(x)
+            if len(buf) >= self.buffer_size:
+                self.__flush(k)
+            yield None
+        self.__flush_all()
+
+    def _finalize(self):
+        self.__flush_all()
+        while len(self.__handles) != 0:
+            self.__handles.popitem(last=False)[1][0].close()
+
+
+class PartitionedCSVFileWriter(PartitionedDSVFileWriter):
+    def __init__(self, name, target_field=None, key=None, encoding='utf-8',
+                 max_open=256, buffer_size=1024):
+        super(PartitionedCSVFileWriter, self).__init__(
+            name, ',', target_field, key, encoding, '\n', 'excel', max_open,
+            buffer_size
+        )
+
+
+class PartitionedTSVFileWriter(PartitionedDSVFileWriter):
+    def __init__(self, name, target_field=None, key=None, encoding='utf-8',
+                 max_open=256, buffer_size=1024):
+        super(PartitionedTSVFileWriter, self).__init__(
+            name, '\t', target_field, key, encoding, '\n', 'excel',
+            max_open, buffer_size
+        )
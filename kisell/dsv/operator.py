@@ -6,6 +6,8 @@ import re
 import operator
 
 from .. core import Pipe
+from .. import operator as _operator
+from .. sketch import KLL, HyperLogLog, SpaceSaving
 
 
 class _ResolveTargetField(object):
@@ -21,12 +23,29 @@ class _ResolveTargetField(object):
                     res.add(i)
             return res
         if isinstance(target_field, int):
-            return set(tuple(target_field))
+            return set((target_field,))
         if isinstance(target_field, Iterable):
             return reduce(lambda x, y: x.union(y), (
                 self._resolve_target_field(field, tf) for tf in target_field
             ))
 
+    def _construct_key(self, func=None):
+        """return a one-argument function which returns the value of the
+        ``target_field`` of a record converted by ``func``, or the tuple of
+        the values when several fields match.
+        """
+        fields = sorted(
+            self._resolve_target_field(self.field, self.target_field)
+        )
+        if len(fields) == 1:
+            i = fields[0]
+            if func is None:
+                return lambda x: x[i]
+            return lambda x: func(x[i])
+        if func is None:
+            return lambda x: tuple(x[i] for i in fields)
+        return lambda x: tuple(func(x[i]) for i in fields)
+
 
 class Filter(Pipe, _ResolveTargetField):
     """Filter records by the condition that the ``target_field`` of the record
@@ -59,23 +78,30 @@ class Filter(Pipe, _ResolveTargetField):
                 yield x
 
 
-class Map(Pipe, _ResolveTargetField):
+class Map(Pipe, _ResolveTargetField, _operator._MemoStats):
     """Generate records applying ``func`` to the ``target_field`` of the
-    record.
+    record. With ``memoize``, results are stored per value in a dict of at
+    most ``memoize`` entries (65536 if ``True``) shared by all the target
+    fields; ``.hits`` and ``.misses`` attributes count the calls answered
+    from it and not.
 
     :param func: one-argument function which returns a boolean
     :param target_field: field name, field index, regular expression or
     tuple of them.
+    :param memoize: ``True`` or maximum number of stored results
+    (default: None)
     """
-    def __init__(self, func, target_field):
+    def __init__(self, func, target_field, memoize=None):
         super(Map, self).__init__()
         self.func = func
         self.target_field = target_field
+        self._memo = _operator._memoize(func, memoize)
 
     def __construct_map(self):
         fields = self._resolve_target_field(self.field, self.target_field)
+        f = self._memo or self.func
         return lambda record: [
-            self.func(x) if i in fields else x for (i, x) in enumerate(record)
+            f(x) if i in fields else x for (i, x) in enumerate(record)
         ]
 
     def _initialize(self):
@@ -159,3 +185,204 @@ class Deselect(Pipe, _ResolveTargetField):
         self.__field = [self.upstream.field[i] for i in fields]
         for x in self.upstream:
             yield [x[i] for i in fields]
+
+
+class _Sketch(Pipe, _ResolveTargetField):
+    """Base class of the pipes which feed the ``target_field`` of each record
+    to ``self.sketch`` in batches and yield the records unchanged. The key
+    of a record is the value of the field, or the tuple of the values when
+    several fields match.
+    """
+    def __init__(self, sketch, target_field, func=None, batch_size=4096):
+        super(_Sketch, self).__init__()
+        self.sketch = sketch
+        self.target_field = target_field
+        self.func = func
+        self.batch_size = batch_size
+
+    def merge(self, other):
+        """merge the sketch of ``other`` (a pipe of the same class or a
+        sketch) into the sketch of this pipe and return this pipe.
+        """
+        self.sketch.merge(getattr(other, 'sketch', other))
+        return self
+
+    def _initialize(self):
+        kf = self._construct_key(self.func)
+        batch = []
+        try:
+            for x in self.upstream:
+                batch.append(kf(x))
+                if len(batch) >= self.batch_size:
+                    self.sketch.update(batch)
+                    batch = []
+                yield x
+        finally:
+            self.sketch.update(batch)
+
+
+class DistinctCount(_Sketch):
+    """Estimate the number of distinct values of ``target_field`` with
+    HyperLogLog. ``.distinct_count`` attribute indicates the estimation.
+
+    :param target_field: field name, field index, regular expression or
+    tuple of them.
+    :param p: precision of ``kisell.sketch.HyperLogLog`` (default: 14)
+    """
+    def __init__(self, target_field, p=14):
+        super(DistinctCount, self).__init__(HyperLogLog(p), target_field)
+
+    @property
+    def distinct_count(self):
+        return self.sketch.count
+
+
+class HeavyHitters(_Sketch):
+    """Find the most frequent values of ``target_field`` with SpaceSaving.
+    ``.heavy_hitters`` attribute is the list of ``(value, count)`` in
+    descending order of count.
+
+    :param target_field: field name, field index, regular expression or
+    tuple of them.
+    :param k: number of monitored values (default: 100)
+    """
+    def __init__(self, target_field, k=100):
+        super(HeavyHitters, self).__init__(SpaceSaving(k), target_field)
+
+    @property
+    def heavy_hitters(self):
+        return self.sketch.top()
+
+
+class Quantiles(_Sketch):
+    """Estimate quantiles of ``target_field`` with a KLL sketch.
+    ``.quantiles`` attribute maps each of ``q`` to its estimation.
+
+    :param target_field: field name, field index, regular expression or
+    tuple of them.
+    :param q: quantiles to report (default: ``(0.25, 0.5, 0.75)``)
+    :param func: one-argument function applied to the values before they are
+    added (default: ``float``)
+    :param k: accuracy parameter of ``kisell.sketch.KLL`` (default: 200)
+    :param seed: seed of the sketch (default: None)
+    """
+    def __init__(self, target_field, q=(0.25, 0.5, 0.75), func=float, k=200,
+                 seed=None):
+        super(Quantiles, self).__init__(KLL(k, seed), target_field, func)
+        self.q = q
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    @property
+    def quantiles(self):
+        return dict((q, self.sketch.quantile(q)) for q in self.q)
+
+
+class _FieldWindow(_ResolveTargetField):
+    """Mix-in class which resolves the value and the timestamp of window
+    operators from fields.
+    """
+
+    def _resolve_single_field(self, target_field):
+        fields = self._resolve_target_field(self.field, target_field)
+        if len(fields) != 1:
+            raise ValueError(
+                '{!r} must match exactly one field'.format(target_field)
+            )
+        return tuple(fields)[0]
+
+    def _extractors(self):
+        i = self._resolve_single_field(self.target_field)
+        f = self.func
+        key = (lambda x: f(x[i])) if f is not None else (lambda x: x[i])
+        if self.time_field is None:
+            return (key, None)
+        j = self._resolve_single_field(self.time_field)
+        g = self.time_func
+        if g is None:
+            return (key, lambda x: x[j])
+        return (key, lambda x: g(x[j]))
+
+
+class TumblingWindow(_FieldWindow, _operator.TumblingWindow):
+    """Aggregate ``target_field`` over consecutive windows of ``size``
+    records, or of duration ``size`` by ``time_field``. See
+    ``kisell.operator.TumblingWindow``.
+
+    :param size: number of records or duration of a window
+    :param target_field: field to aggregate
+    :param aggregate: ``'sum'``, ``'mean'``, ``'min'``, ``'max'``,
+    ``'count'`` or tuple of them (default: ``'sum'``)
+    :param time_field: field of the timestamp (default: None)
+    :param func: conversion of the values (default: ``float``)
+    :param time_func: conversion of the timestamps (default: ``float``)
+    :param origin: start of the first window (default: the first timestamp)
+    """
+    def __init__(self, size, target_field, aggregate='sum', time_field=None,
+                 func=float, time_func=float, origin=None):
+        super(TumblingWindow, self).__init__(size, aggregate, origin=origin)
+        self.target_field = target_field
+        self.time_field = time_field
+        self.func = func
+        self.time_func = time_func
+
+
+class SlidingWindow(_FieldWindow, _operator.SlidingWindow):
+    """Aggregate ``target_field`` over the last ``size`` records, or over the
+    records within ``size`` by ``time_field``. See
+    ``kisell.operator.SlidingWindow``.
+
+    :param size: number of records or duration of the window
+    :param target_field: field to aggregate
+    :param aggregate: ``'sum'``, ``'mean'``, ``'min'``, ``'max'``,
+    ``'count'`` or tuple of them (default: ``'sum'``)
+    :param time_field: field of the timestamp (default: None)
+    :param func: conversion of the values (default: ``float``)
+    :param time_func: conversion of the timestamps (default: ``float``)
+    """
+    def __init__(self, size, target_field, aggregate='sum', time_field=None,
+                 func=float, time_func=float):
+        super(SlidingWindow, self).__init__(size, aggregate)
+        self.target_field = target_field
+        self.time_field = time_field
+        self.func = func
+        self.time_func = time_func
+
+
+class Distinct(_operator.Distinct, _ResolveTargetField):
+    """Drop records whose ``target_field`` has been seen before. See
+    ``kisell.operator.Distinct``.
+
+    :param target_field: field name, field index, regular expression or
+    tuple of them.
+    :param mode: ``'exact'`` or ``'bloom'`` (default: ``'exact'``)
+    """
+    def __init__(self, target_field, mode='exact', memory_limit=10000000,
+                 capacity=100000000, error_rate=0.001, directory=None):
+        super(Distinct, self).__init__(None, mode, memory_limit, capacity,
+                                       error_rate, directory)
+        self.target_field = target_field
+
+    def _key(self):
+        return self._construct_key()
+
+
+class TopK(_operator.TopK, _ResolveTargetField):
+    """Yield the ``k`` records with the smallest (largest if ``reverse``)
+    ``target_field``. See ``kisell.operator.TopK``.
+
+    :param k: number of records
+    :param target_field: field name, field index, regular expression or
+    tuple of them.
+    :param reverse: take the largest records (default: False)
+    :param func: one-argument function applied to the values before they are
+    compared, e.g. ``float`` (default: None)
+    """
+    def __init__(self, k, target_field, reverse=False, func=None):
+        super(TopK, self).__init__(k, None, reverse)
+        self.target_field = target_field
+        self.func = func
+
+    def _key(self):
+        return self._construct_key(self.func)
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+from .. import parallel as _parallel
+from . operator import _ResolveTargetField
+
+
+class Exchange(_parallel.Exchange, _ResolveTargetField):
+    """Hash-partition records by ``target_field`` across worker processes,
+    each running its own copy of ``pipe``. See ``kisell.parallel.Exchange``.
+
+    :param pipe: pipe or chain of pipes run by each worker
+    :param target_field: field name, field index, regular expression or
+    tuple of them.
+    :param workers: number of worker processes (default: number of CPUs)
+    """
+    def __init__(self, pipe, target_field, workers=None, batch_size=1024,
+                 slots=8, slot_size=1 << 20):
+        super(Exchange, self).__init__(pipe, None, workers, batch_size,
+                                       slots, slot_size)
+        self.target_field = target_field
+
+    def _key(self):
+        return self._construct_key()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import numpy
+
+from .. core import Pipe
+from .. util import _batches
+from .. vector import _tolist
+from . operator import _ResolveTargetField
+
+
+class VectorMap(Pipe, _ResolveTargetField):
+    """Apply ``func`` to the columns of ``target_field`` of batches of
+    records. Each column of a batch is converted to a ``numpy.ndarray`` of
+    ``dtype`` and passed to ``func`` in a single call.
+
+    :param func: one-argument function which takes an array and returns an\
+    array of the same length
+    :param target_field: field name, field index, regular expression or
+    tuple of them.
+    :param batch_size: number of records per batch (default: 4096)
+    :param dtype: dtype of the arrays (default: float)
+    """
+    def __init__(self, func, target_field, batch_size=4096, dtype=float):
+        super(VectorMap, self).__init__()
+        self.func = func
+        self.target_field = target_field
+        self.batch_size = batch_size
+        self.dtype = dtype
+
+    def _initialize(self):
+        fields = sorted(
+            self._resolve_target_field(self.field, self.target_field)
+        )
+        for batch in _batches(self.upstream, self.batch_size):
+            batch = [list(x) for x in batch]
+            for i in fields:
+                res = self.func(
+                    numpy.array([x[i] for x in batch], dtype=self.dtype)
+                )
+                for (x, v) in zip(batch, _tolist(res)):
+                    x[i] = v
+            for x in batch:
+                yield x
+
+
+class VectorFilter(Pipe, _ResolveTargetField):
+    """Filter records by the condition that the ``target_field`` of the record
+    satisfies ``func``, which computes a boolean mask from a column of a
+    batch of records converted to a ``numpy.ndarray`` of ``dtype``.
+
+    :param func: one-argument function which takes an array and returns a\
+    boolean array of the same length
+    :param target_field: field name, field index, regular expression or
+    tuple of them.
+    :param batch_size: number of records per batch (default: 4096)
+    :param dtype: dtype of the arrays (default: float)
+    """
+    def __init__(self, func, target_field, batch_size=4096, dtype=float):
+        super(VectorFilter, self).__init__()
+        self.func = func
+        self.target_field = target_field
+        self.batch_size = batch_size
+        self.dtype = dtype
+
+    def _initialize(self):
+        fields = sorted(
+            self._resolve_target_field(self.field, self.target_field)
+        )
+        for batch in _batches(self.upstream, self.batch_size):
+            mask = numpy.ones(len(batch), dtype=bool)
+            for i in fields:
+                mask &= self.func(
+                    numpy.array([x[i] for x in batch], dtype=self.dtype)
+                )
+            for x in itertools.compress(batch, mask.tolist()):
+                yield x
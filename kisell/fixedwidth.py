@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import struct
+
+from . core import Pipe
+from . util import CompoOrigin, CompoPipe
+from . io import FileReadStream, FileWriteStream
+from . operator import _MISSING
+
+
+def _columns(layout):
+    """return the list of ``(name, start, end, func)`` of the named columns
+    of ``layout`` and the total width.
+    """
+    res = []
+    start = 0
+    for column in layout:
+        (name, width) = column[:2]
+        func = column[2] if len(column) > 2 else None
+        if name is not None:
+            res.append((name, start, start + width, func))
+        start += width
+    return (res, start)
+
+
+def _compile(layout, binary, encoding, strip):
+    """compile ``layout`` into a one-argument function which takes a line and
+    returns the list of its fields.
+    """
+    columns = _columns(layout)[0]
+    namespace = {}
+    values = []
+    for (i, (_, start, end, func)) in enumerate(columns):
+        if binary:
+            v = 'v[{}].decode(encoding)'.format(i)
+        else:
+            v = 'x[{}:{}]'.format(start, end)
+        if strip:
+            v += '.strip()'
+        if func is not None:
+            namespace['f{}'.format(i)] = func
+            v = 'f{}({})'.format(i, v)
+        values.append(v)
+    source = 'def parse(x):\n'
+    if binary:
+        fmt = []
+        pos = 0
+        for (_, start, end, _) in columns:
+            if start > pos:
+                fmt.append('{}x'.format(start - pos))
+            fmt.append('{}s'.format(end - start))
+            pos = end
+        s = struct.Struct('=' + ''.join(fmt))
+        namespace['unpack'] = s.unpack_from
+        namespace['encoding'] = encoding
+        namespace['size'] = s.size
+        source += '    v = unpack(x if len(x) >= size else x.ljust(size))\n'
+    source += '    return [{}]\n'.format(', '.join(values))
+    exec(source, namespace)
+    return namespace['parse']
+
+
+class FixedWidthParse(Pipe):
+    """Parse fixed-width lines. ``layout`` is a sequence of
+    ``(name, width)`` or ``(name, width, func)``; a column whose name is
+    ``None`` is skipped, and ``func`` converts the value of the column. The
+    layout is compiled once into a function which slices ``str`` lines, or
+    into a ``struct`` format which unpacks ``bytes`` lines. The column names
+    are exposed as ``field``.
+
+    :param layout: sequence of column definitions
+    :param encoding: encoding of ``bytes`` lines (default: utf-8)
+    :param strip: strip whitespaces around the values (default: True)
+    """
+    def __init__(self, layout, encoding='utf-8', strip=True):
+        super(FixedWidthParse, self).__init__()
+        self.layout = layout
+        self.encoding = encoding
+        self.strip = strip
+        self.field = [c[0] for c in _columns(layout)[0]]
+
+    def _initialize(self):
+        it = iter(self.upstream)
+        first = next(it, _MISSING)
+        if first is _MISSING:
+            return
+        parse = _compile(self.layout, isinstance(first, bytes),
+                         self.encoding, self.strip)
+        for x in itertools.chain([first], it):
+            yield parse(x)
+
+
+class FixedWidthFormat(Pipe):
+    """From records to fixed-width lines. Each value is converted by ``str``
+    and left-aligned in its column; too long values are truncated. Columns
+    whose name is ``None`` are filled with spaces.
+
+    :param layout: sequence of ``(name, width)``
+    :param lineterminator: line end character (default: ``\\n``)
+    """
+    def __init__(self, layout, lineterminator='\n'):
+        super(FixedWidthFormat, self).__init__()
+        self.layout = layout
+        self.lineterminator = lineterminator
+
+    def __template(self):
+        res = []
+        i = 0
+        for column in self.layout:
+            (name, width) = column[:2]
+            if name is None:
+                res.append(' ' * width)
+            else:
+                res.append('{{{0}:<{1}.{1}}}'.format(i, width))
+                i += 1
+        return ''.join(res) + self.lineterminator
+
+    def _initialize(self):
+        template = self.__template()
+        for x in self.upstream:
+            yield template.format(*[str(v) for v in x])
+
+
+class FixedWidthFileReader(CompoOrigin):
+    """Read a fixed-width file. See ``FixedWidthParse``.
+
+    :param name: file name
+    :param layout: sequence of column definitions
+    :param encoding: file encoding (default: utf-8)
+    :param binary: read ``bytes`` lines and unpack them with ``struct``\
+    (default: False)
+    :param strip: strip whitespaces around the values (default: True)
+    """
+    def __init__(self, name, layout, encoding='utf-8', binary=False,
+                 strip=True):
+        super(FixedWidthFileReader, self).__init__(
+            FileReadStream(name, encoding, binary),
+            FixedWidthParse(layout, encoding, strip)
+        )
+
+
+class FixedWidthFileWriter(CompoPipe):
+    """Write records to a fixed-width file. See ``FixedWidthFormat``.
+
+    :param name: file name
+    :param layout: sequence of ``(name, width)``
+    :param encoding: file encoding (default: utf-8)
+    :param lineterminator: line end character (default: ``\\n``)
+    """
+    def __init__(self, name, layout, encoding='utf-8', lineterminator='\n'):
+        super(FixedWidthFileWriter, self).__init__(
+            FixedWidthFormat(layout, lineterminator),
+            FileWriteStream(name, encoding, lineterminator='')
+        )
@@ -1,8 +1,16 @@
 # -*- coding: utf-8 -*-
 
 from builtins import open
+import glob
+import itertools
+import json
+import os
+import time
+
+from future.utils import string_types
 
 from . core import Origin, Pipe
+from . util import _BackgroundIterator
 
 
 class ReadStream(Origin):
@@ -34,15 +42,215 @@ class FileReadStream(Origin):
     ``kisell.core.Origin``.
 
     :param name: file name
+    :param encoding: file encoding (default: utf-8). ignored if ``binary``
+    :param binary: yield undecoded ``bytes`` lines (default: False)
+    """
+    def __init__(self, name, encoding='utf-8', binary=False):
+        if binary:
+            f = open(name, mode='rb')
+        else:
+            f = open(name, encoding=encoding, mode='r')
+        self.__tracked = False
+        super(FileReadStream, self).__init__(f)
+
+    def _initialize(self):
+        if self.__tracked:
+            f = self.origin
+            return iter(f.readline, f.read(0))
+        return super(FileReadStream, self)._initialize()
+
+    def _finalize(self):
+        self.origin.close()
+
+    def _get_state(self):
+        return self.origin.tell()
+
+    def _set_state(self, state):
+        self.__tracked = True
+        if state is not None:
+            self.origin.seek(state)
+
+
+class MultiFileReadStream(Origin):
+    """``MultiFileReadStream`` reads several files as one stream of lines.
+    A background thread opens and reads the files ahead of the consumer,
+    holding at most ``readahead`` batches of lines.
+
+    :param names: list of file names or a glob pattern
     :param encoding: file encoding (default: utf-8)
+    :param readahead: maximum number of batches read ahead (default: 16)
+    :param batch_size: number of lines per batch (default: 1024)
     """
-    def __init__(self, name, encoding='utf-8'):
-        super(FileReadStream, self).__init__(
-            open(name, encoding=encoding, mode='r')
+
+    @classmethod
+    def __generator(cls, names, encoding, batch_size):
+        for (i, name) in enumerate(names):
+            with open(name, encoding=encoding, mode='r') as f:
+                while True:
+                    lines = list(itertools.islice(f, batch_size))
+                    if len(lines) == 0:
+                        break
+                    yield (i, lines)
+
+    def __init__(self, names, encoding='utf-8', readahead=16,
+                 batch_size=1024):
+        if isinstance(names, string_types):
+            names = sorted(glob.glob(names))
+        self.names = list(names)
+        self.encoding = encoding
+        self.readahead = readahead
+        self.batch_size = batch_size
+        self.__background = None
+        super(MultiFileReadStream, self).__init__(
+            self.names, lambda names: self.__lines()
         )
 
+    def __read(self):
+        """return the batches read on the background thread, which is
+        started on the first call.
+        """
+        if self.__background is None:
+            self.__background = _BackgroundIterator(
+                self.__class__.__generator(self.names, self.encoding,
+                                           self.batch_size),
+                self.readahead, 1
+            )
+        return self.__background
+
+    def __lines(self):
+        for (_, lines) in self.__read():
+            for line in lines:
+                yield line
+
+    def files(self):
+        """return an iterator of ``(name, lines)`` pairs, one per non-empty
+        file. ``lines`` must be consumed before the next pair is taken.
+        """
+        for (i, group) in itertools.groupby(self.__read(),
+                                            lambda x: x[0]):
+            yield (self.names[i],
+                   (line for (_, lines) in group for line in lines))
+
     def _finalize(self):
-        self.origin.close()
+        if self.__background is not None:
+            self.__background.close()
+            self.__background = None
+
+
+class FollowFileReadStream(Origin):
+    """``FollowFileReadStream`` reads lines of a growing file such as a log
+    and keeps waiting for new lines at EOF, like ``tail -F``. New data is
+    read in chunks of ``chunk_size`` bytes and an incomplete last line is
+    held back until it is terminated. When the file is replaced (rotation),
+    the rest of the old file is read before the new one is opened; when it
+    shrinks (truncation), reading restarts from the beginning.
+
+    ``offset`` is the byte offset after the last line taken by the
+    downstream and handed on to it. With ``checkpoint``, it is saved to the
+    sidecar file ``name + '.offset'`` while waiting and on finalization, and
+    a new instance resumes from there if the file is still the same.
+
+    :param name: file name
+    :param encoding: file encoding (default: utf-8)
+    :param poll_interval: seconds to wait at EOF before polling again\
+    (default: 1.0)
+    :param idle_timeout: stop after this many seconds without new data\
+    (default: None, never stop)
+    :param checkpoint: save and restore ``offset`` (default: True)
+    :param chunk_size: number of bytes read at once (default: 1048576)
+    """
+    suffix = '.offset'
+
+    def __init__(self, name, encoding='utf-8', poll_interval=1.0,
+                 idle_timeout=None, checkpoint=True, chunk_size=1048576):
+        self.name = name
+        self.encoding = encoding
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.checkpoint = checkpoint
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.__inode = None
+        self.__file = None
+        super(FollowFileReadStream, self).__init__(
+            name, lambda name: self.__follow()
+        )
+
+    def __load(self):
+        try:
+            with open(self.name + self.suffix, 'r') as f:
+                state = json.load(f)
+            st = os.stat(self.name)
+        except (IOError, OSError, ValueError):
+            return 0
+        if state.get('inode') != st.st_ino or state['offset'] > st.st_size:
+            return 0
+        return state['offset']
+
+    def save(self):
+        """write ``offset`` to the sidecar file.
+        """
+        if self.__inode is None:
+            return
+        tmp = self.name + self.suffix + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'inode': self.__inode, 'offset': self.offset}, f)
+        os.rename(tmp, self.name + self.suffix)
+
+    def __open(self, offset):
+        f = open(self.name, mode='rb')
+        f.seek(offset)
+        self.__file = f
+        self.__inode = os.fstat(f.fileno()).st_ino
+        self.offset = offset
+        return f
+
+    def __replaced(self):
+        try:
+            st = os.stat(self.name)
+        except OSError:
+            return False
+        return st.st_ino != self.__inode
+
+    def __follow(self):
+        f = self.__open(self.__load() if self.checkpoint else 0)
+        partial = b''
+        idle_since = time.time()
+        while True:
+            data = f.read(self.chunk_size)
+            if len(data) != 0:
+                idle_since = time.time()
+                lines = (partial + data).split(b'\n')
+                partial = lines.pop()
+                for line in lines:
+                    self.offset += len(line) + 1
+                    yield line.decode(self.encoding) + u'\n'
+                continue
+            if self.__replaced():
+                if len(partial) != 0:
+                    yield partial.decode(self.encoding)
+                partial = b''
+                f.close()
+                f = self.__open(0)
+                continue
+            if os.fstat(f.fileno()).st_size < f.tell():
+                partial = b''
+                f.seek(0)
+                self.offset = 0
+                continue
+            if self.checkpoint:
+                self.save()
+            if self.idle_timeout is not None and \
+                    time.time() - idle_since >= self.idle_timeout:
+                return
+            time.sleep(self.poll_interval)
+
+    def _finalize(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+        if self.checkpoint:
+            self.save()
 
 
 class WriteStream(Pipe):
@@ -71,12 +279,37 @@ class FileWriteStream(WriteStream):
     :param name: file name
     :param encoding: file encoding (defautl: utf-8)
     :param lineterminator: line end character (default: ``\\n``)
+    :param resume: do not truncate the file on construction, so that\
+    ``kisell.checkpoint.Checkpoint`` can truncate it to the restored\
+    position on initialization (default: False)
     """
-    def __init__(self, name, encoding='utf-8', lineterminator='\n'):
+    def __init__(self, name, encoding='utf-8', lineterminator='\n',
+                 resume=False):
+        self.__file = open(name, encoding=encoding,
+                           mode='a' if resume else 'w')
+        self.resume = resume
+        self.__position = 0
         super(FileWriteStream, self).__init__(
-            open(name, encoding=encoding, mode='w'),
-            lineterminator=lineterminator
+            self.__file, lineterminator=lineterminator
         )
 
+    def _initialize(self):
+        if self.resume and self.__file.seekable():
+            self.__file.truncate(self.__position)
+        return super(FileWriteStream, self)._initialize()
+
     def _finalize(self):
-        self.origin.close()
+        self.__file.close()
+
+    def _get_state(self):
+        self.__file.flush()
+        return self.__file.tell()
+
+    def _set_state(self, state):
+        if state is not None and not self.resume:
+            raise ValueError(
+                '\'{}\' was truncated; open it with resume=True'.format(
+                    self.__file.name
+                )
+            )
+        self.__position = state or 0
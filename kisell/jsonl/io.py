@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+from builtins import open
+
+from .. core import Pipe
+from .. util import CompoOrigin, _batches
+from .. io import FileReadStream
+from .. parallel import _context
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    try:
+        import ujson as _json
+    except ImportError:
+        import json as _json
+
+    _loads = _json.loads
+
+    def _dumps(x):
+        return _json.dumps(x, ensure_ascii=False,
+                           separators=(',', ':')).encode('utf-8')
+
+
+def _decode(lines, field=None):
+    """decode a batch of lines, skipping blank ones. Each line is decoded on
+    its own, so that a malformed line raises even when the batch joined
+    into a JSON array would be valid, e.g. ``[1`` followed by ``2]``.
+    """
+    res = [_loads(x) for x in lines if not x.isspace()]
+    if field is not None:
+        return [[x.get(f) for f in field] for x in res]
+    return res
+
+
+class JSONLParse(Pipe):
+    """Parse JSON Lines. Lines are decoded in batches of ``batch_size``, by
+    ``orjson`` or ``ujson`` if one is installed. Each object is yielded as a
+    dict, or, if ``field`` is given, as the list of its values of ``field``,
+    which is exposed as the ``field`` attribute so that ``kisell.dsv``
+    stages work downstream. With ``processes``, batches are decoded by a
+    pool of worker processes in the order of the input.
+
+    :param field: list of keys to project (default: None)
+    :param batch_size: number of lines per batch (default: 1024)
+    :param processes: number of worker processes (default: None)
+    """
+    def __init__(self, field=None, batch_size=1024, processes=None):
+        super(JSONLParse, self).__init__()
+        self.projection = None if field is None else list(field)
+        if field is not None:
+            self.field = self.projection
+        self.batch_size = batch_size
+        self.processes = processes
+        self.__pool = None
+
+    def _initialize(self):
+        decode = _ProjectedDecode(self.projection)
+        batches = _batches(self.upstream, self.batch_size)
+        if self.processes is None:
+            decoded = (decode(b) for b in batches)
+        else:
+            self.__pool = _context().Pool(self.processes)
+            decoded = self.__pool.imap(decode, batches)
+        for batch in decoded:
+            for x in batch:
+                yield x
+
+    def _finalize(self):
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+
+
+class _ProjectedDecode(object):
+    """picklable ``_decode`` bound to ``field``.
+    """
+    def __init__(self, field):
+        self.field = field
+
+    def __call__(self, lines):
+        return _decode(lines, self.field)
+
+
+class JSONLFormat(Pipe):
+    """From records to JSON Lines. A list record is converted to the object
+    which maps ``field`` of the upstream to its values.
+    """
+    def __init__(self):
+        super(JSONLFormat, self).__init__()
+
+    def _initialize(self):
+        try:
+            field = self.field
+        except AttributeError:
+            field = None
+        for x in self.upstream:
+            if field is not None and isinstance(x, (list, tuple)):
+                x = dict(zip(field, x))
+            yield _dumps(x).decode('utf-8') + u'\n'
+
+
+class JSONLFileReader(CompoOrigin):
+    """Read a JSON Lines file. See ``JSONLParse``.
+
+    :param name: file name
+    :param field: list of keys to project (default: None)
+    :param batch_size: number of lines per batch (default: 1024)
+    :param processes: number of worker processes (default: None)
+    """
+    def __init__(self, name, field=None, batch_size=1024, processes=None):
+        super(JSONLFileReader, self).__init__(
+            FileReadStream(name, binary=True),
+            JSONLParse(field, batch_size, processes)
+        )
+
+
+class JSONLFileWriter(Pipe):
+    """Write records to ``name`` as JSON Lines in UTF-8. A list record is
+    converted to the object which maps ``field`` of the upstream to its
+    values. Encoded records are joined and written in batches of
+    ``batch_size`` to a buffered binary file. On each iteration, it consumes
+    one record and yields ``None``.
+
+    :param name: file name
+    :param batch_size: number of records per write (default: 1024)
+    :param buffer_size: size of the file buffer (default: 1048576)
+    """
+    def __init__(self, name, batch_size=1024, buffer_size=1048576):
+        super(JSONLFileWriter, self).__init__()
+        self.batch_size = batch_size
+        self.__file = open(name, mode='wb', buffering=buffer_size)
+
+    def __write(self, batch):
+        batch.append(b'')
+        self.__file.write(b'\n'.join(batch))
+
+    def _initialize(self):
+        try:
+            field = self.field
+        except AttributeError:
+            field = None
+        batch = []
+        try:
+            for x in self.upstream:
+                if field is not None and isinstance(x, (list, tuple)):
+                    x = dict(zip(field, x))
+                batch.append(_dumps(x))
+                if len(batch) >= self.batch_size:
+                    self.__write(batch)
+                    batch = []
+                yield None
+        finally:
+            if len(batch) != 0:
+                self.__write(batch)
+
+    def _finalize(self):
+        self.__file.close()
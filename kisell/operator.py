@@ -1,66 +1,86 @@
-# -*- coding: utf-8 -*-
+# -*- coding: utf-8 -*-
 
+from array import array
+from bisect import bisect_left
+from collections import deque
+import heapq
 import itertools
+import math
+import mmap
 import operator
+import os
+import random
+import shutil
+import tempfile
+import threading
 
 from . core import Base, Pipe, Origin
+from . sketch import BloomFilter, _hash64
 
 
-class Limit(Pipe):
-    def __init__(self, limit):
-        super(Limit, self).__init__()
-        self.limit = limit
-
-    def _initialize(self):
-        count = 0
-        for x in self.upstream:
-            if count >= self.limit:
-                raise StopIteration()
-            yield x
-            count += 1
-
-
-class Skip(Pipe):
-    def __init__(self, skip):
-        super(Skip, self).__init__()
-        self.skip = skip
-
-    def _initialize(self):
-        count = 0
-        for x in self.upstream:
-            if count < self.skip:
-                count += 1
-            else:
+_MISSING = object()
+
+
+class Limit(Pipe):
+    def __init__(self, limit):
+        super(Limit, self).__init__()
+        self.limit = limit
+
+    def _initialize(self):
+        if self.limit <= 0:
+            return
+        it = iter(self.upstream)
+        try:
+            for (count, x) in enumerate(it, 1):
                 yield x
-                break
-        for x in self.upstream:
-            yield x
+                if count >= self.limit:
+                    return
+        finally:
+            it.close()
+
+
+class Skip(Pipe):
+    def __init__(self, skip):
+        super(Skip, self).__init__()
+        self.skip = skip
 
-
-class Chain(Pipe):
-    def __init__(self, *iterables):
-        super(Chain, self).__init__()
-        self.iterables = tuple(it if isinstance(it, Base) else Origin(it)
-                               for it in iterables)
-
-    def _initialize(self):
-        if self.upstream is not None:
+    def _initialize(self):
+        count = 0
+        seek = getattr(type(self.upstream), 'seek_record', None)
+        if seek is not None and self.skip > 0:
+            count = seek(self.upstream, self.skip)
+        it = iter(self.upstream)
+        try:
+            for x in itertools.islice(it, max(self.skip - count, 0), None):
+                yield x
+        finally:
+            it.close()
+
+
+class Chain(Pipe):
+    def __init__(self, *iterables):
+        super(Chain, self).__init__()
+        self.iterables = tuple(it if isinstance(it, Base) else Origin(it)
+                               for it in iterables)
+
+    def _initialize(self):
+        if self.upstream is not None:
             for x in self.upstream:
                 yield x
-        for it in self.iterables:
+        for it in self.iterables:
             for x in it:
                 yield x
-
-
-class Enumerate(Pipe):
-    def __init__(self):
-        super(Enumerate, self).__init__()
-
-    def _initialize(self):
-        count = 0
-        for x in self.upstream:
-            yield (count, x)
-            count += 1
+
+
+class Enumerate(Pipe):
+    def __init__(self):
+        super(Enumerate, self).__init__()
+
+    def _initialize(self):
+        count = 0
+        for x in self.upstream:
+            yield (count, x)
+            count += 1
 
 
 class GroupBy(Pipe):
@@ -84,45 +104,783 @@ class Filter(Pipe):
                 yield x
 
 
-class Zip(Pipe):
-    def __init__(self, *iterables):
-        super(Zip, self).__init__()
-        self.iterables = tuple(it if isinstance(it, Base) else Origin(it)
-                               for it in iterables)
-
+class Zip(Pipe):
+    def __init__(self, *iterables):
+        super(Zip, self).__init__()
+        self.iterables = tuple(it if isinstance(it, Base) else Origin(it)
+                               for it in iterables)
+
     def _initialize(self):
         for x in zip(self.upstream, *self.iterables):
             yield x
-
-
-class Map(Pipe):
-    def __init__(self, func, *iterables):
-        super(Map, self).__init__()
-        self.func = func
-        self.iterables = tuple(it if isinstance(it, Base) else Origin(it)
-                               for it in iterables)
-
-    def _initialize(self):
-        for x in map(self.func, self.upstream, *self.iterables):
+
+
+class _Memo(object):
+    """Memoized function. Holds at most ``maxsize`` results; once it is
+    full, results for new arguments are computed but not stored. Unhashable
+    arguments are passed through.
+
+    :param func: function
+    :param maxsize: maximum number of stored results
+    """
+    def __init__(self, func, maxsize):
+        self.func = func
+        self.maxsize = maxsize
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, *args):
+        key = args[0] if len(args) == 1 else args
+        try:
+            res = self.cache[key]
+        except KeyError:
+            self.misses += 1
+            res = self.func(*args)
+            if len(self.cache) < self.maxsize:
+                self.cache[key] = res
+            return res
+        except TypeError:
+            self.misses += 1
+            return self.func(*args)
+        self.hits += 1
+        return res
+
+
+def _memoize(func, memoize):
+    """return ``_Memo`` of ``func`` or ``None``.
+
+    :param memoize: ``None``, ``False``, ``True`` or maximum number of\
+    stored results
+    """
+    if memoize is None or memoize is False:
+        return None
+    if memoize is True:
+        return _Memo(func, 65536)
+    return _Memo(func, memoize)
+
+
+class _MemoStats(object):
+    """Mix-in class which exposes the counters of ``self._memo``.
+    """
+
+    @property
+    def hits(self):
+        return self._memo.hits if self._memo is not None else 0
+
+    @property
+    def misses(self):
+        return self._memo.misses if self._memo is not None else 0
+
+
+class Map(Pipe, _MemoStats):
+    """Apply ``func`` to each record, and to the items of ``iterables`` in
+    parallel. With ``memoize``, results are stored per argument in a dict of
+    at most ``memoize`` entries (65536 if ``True``); ``.hits`` and
+    ``.misses`` attributes count the calls answered from it and not.
+
+    :param func: function
+    :param iterables: iterables
+    :param memoize: ``True`` or maximum number of stored results\
+    (default: None)
+    """
+    def __init__(self, func, *iterables, **kwargs):
+        super(Map, self).__init__()
+        self.func = func
+        self.iterables = tuple(it if isinstance(it, Base) else Origin(it)
+                               for it in iterables)
+        self._memo = _memoize(func, kwargs.pop('memoize', None))
+        if len(kwargs) != 0:
+            raise TypeError(
+                'unexpected keyword argument \'{}\''.format(
+                    next(iter(kwargs))
+                )
+            )
+
+    def _initialize(self):
+        for x in map(self._memo or self.func, self.upstream,
+                     *self.iterables):
             yield x
-
-
-class StarMap(Pipe):
-    def __init__(self, func):
-        super(StarMap, self).__init__()
-        self.func = func
-
+
+
+class StarMap(Pipe):
+    def __init__(self, func):
+        super(StarMap, self).__init__()
+        self.func = func
+
     def _initialize(self):
         for x in itertools.starmap(self.func, self.upstream):
             yield x
-
-
-class Accumulate(Pipe):
-    def __init__(self, func=None):
-        super(Accumulate, self).__init__()
-        self.func = func
-
-    def _initialize(self):
-        for x in itertools.accumulate(self.upstream,
-                                      self.func or operator.add):
+
+
+class Accumulate(Pipe):
+    def __init__(self, func=None):
+        super(Accumulate, self).__init__()
+        self.func = func
+        self.__tracked = False
+        self.__total = _MISSING
+
+    def _initialize(self):
+        func = self.func or operator.add
+        if self.__total is _MISSING:
+            it = itertools.accumulate(self.upstream, func)
+        else:
+            it = itertools.islice(itertools.accumulate(
+                itertools.chain([self.__total], self.upstream), func
+            ), 1, None)
+        if not self.__tracked:
+            for x in it:
+                yield x
+            return
+        for x in it:
+            self.__total = x
+            yield x
+
+    def _get_state(self):
+        return None if self.__total is _MISSING else (self.__total,)
+
+    def _set_state(self, state):
+        self.__tracked = True
+        if state is not None:
+            self.__total = state[0]
+
+
+class _Sum(object):
+    def __init__(self):
+        self.total = 0
+
+    def add(self, v):
+        self.total += v
+
+    def remove(self, v):
+        self.total -= v
+
+    def value(self):
+        return self.total
+
+
+class _Count(object):
+    def __init__(self):
+        self.n = 0
+
+    def add(self, v):
+        self.n += 1
+
+    def remove(self, v):
+        self.n -= 1
+
+    def value(self):
+        return self.n
+
+
+class _Mean(object):
+    def __init__(self):
+        self.total = 0
+        self.n = 0
+
+    def add(self, v):
+        self.total += v
+        self.n += 1
+
+    def remove(self, v):
+        self.total -= v
+        self.n -= 1
+
+    def value(self):
+        return float(self.total) / self.n if self.n != 0 else None
+
+
+class _Min(object):
+    """Monotonic deque. ``remove`` must be called in the order of ``add``.
+    """
+    def __init__(self):
+        self.candidates = deque()
+
+    def _before(self, a, b):
+        return a <= b
+
+    def add(self, v):
+        c = self.candidates
+        while len(c) != 0 and not self._before(c[-1], v):
+            c.pop()
+        c.append(v)
+
+    def remove(self, v):
+        if len(self.candidates) != 0 and self.candidates[0] == v:
+            self.candidates.popleft()
+
+    def value(self):
+        return self.candidates[0] if len(self.candidates) != 0 else None
+
+
+class _Max(_Min):
+    def _before(self, a, b):
+        return a >= b
+
+
+_AGGREGATES = {
+    'sum': _Sum, 'count': _Count, 'mean': _Mean, 'min': _Min, 'max': _Max
+}
+
+
+class _Aggregates(object):
+    def __init__(self, names):
+        self.aggregators = tuple(_AGGREGATES[n]() for n in names)
+
+    def add(self, v):
+        for a in self.aggregators:
+            a.add(v)
+
+    def remove(self, v):
+        for a in self.aggregators:
+            a.remove(v)
+
+    def value(self):
+        return tuple(a.value() for a in self.aggregators)
+
+
+class _Window(Pipe):
+    """Base class of window operators.
+    """
+    def __init__(self, size, aggregate='sum', key=None, timestamp=None):
+        super(_Window, self).__init__()
+        names = (aggregate,) if isinstance(aggregate, str) else aggregate
+        for name in names:
+            if name not in _AGGREGATES:
+                raise ValueError(
+                    'unknown aggregate \'{}\''.format(name)
+                )
+        self.size = size
+        self.aggregate = aggregate
+        self.key = key
+        self.timestamp = timestamp
+
+    def _extractors(self):
+        """return the pair of functions which take a record and return its
+        value and its timestamp.
+        """
+        return (self.key or (lambda x: x), self.timestamp)
+
+    def _aggregator(self):
+        if isinstance(self.aggregate, str):
+            return _AGGREGATES[self.aggregate]()
+        return _Aggregates(self.aggregate)
+
+
+class TumblingWindow(_Window):
+    """Aggregate consecutive, non-overlapping windows. Without ``timestamp``
+    a window is ``size`` records and the aggregate of each window is
+    yielded. With ``timestamp`` a window spans ``size`` (a number or a
+    ``timedelta``) from ``origin`` and ``(window_start, aggregate)`` is
+    yielded for each non-empty window; records must come in timestamp order.
+
+    :param size: number of records or duration of a window
+    :param aggregate: ``'sum'``, ``'mean'``, ``'min'``, ``'max'``,\
+    ``'count'`` or tuple of them (default: ``'sum'``)
+    :param key: one-argument function which returns the value to aggregate\
+    (default: the record itself)
+    :param timestamp: one-argument function which returns the timestamp of a\
+    record (default: None)
+    :param origin: start of the first window (default: the first timestamp)
+    """
+    def __init__(self, size, aggregate='sum', key=None, timestamp=None,
+                 origin=None):
+        super(TumblingWindow, self).__init__(size, aggregate, key, timestamp)
+        self.origin = origin
+
+    def __by_count(self, key):
+        agg = None
+        n = 0
+        for x in self.upstream:
+            if agg is None:
+                agg = self._aggregator()
+            agg.add(key(x))
+            n += 1
+            if n == self.size:
+                yield agg.value()
+                agg = None
+                n = 0
+        if agg is not None:
+            yield agg.value()
+
+    def __by_time(self, key, timestamp):
+        origin = self.origin
+        agg = None
+        start = end = None
+        for x in self.upstream:
+            t = timestamp(x)
+            if origin is None:
+                origin = t
+            if agg is None or not t < end:
+                if agg is not None:
+                    yield (start, agg.value())
+                start = origin + ((t - origin) // self.size) * self.size
+                end = start + self.size
+                agg = self._aggregator()
+            agg.add(key(x))
+        if agg is not None:
+            yield (start, agg.value())
+
+    def _initialize(self):
+        (key, timestamp) = self._extractors()
+        if timestamp is None:
+            return self.__by_count(key)
+        return self.__by_time(key, timestamp)
+
+
+class SlidingWindow(_Window):
+    """Aggregate a window which slides by one record. Without ``timestamp``
+    the window is the last ``size`` records and its aggregate is yielded for
+    each record. With ``timestamp`` the window holds the records whose
+    timestamp is within ``size`` before the current one and
+    ``(timestamp, aggregate)`` is yielded for each record; records must come
+    in timestamp order. Each record costs O(1) amortized time.
+
+    :param size: number of records or duration of the window
+    :param aggregate: ``'sum'``, ``'mean'``, ``'min'``, ``'max'``,\
+    ``'count'`` or tuple of them (default: ``'sum'``)
+    :param key: one-argument function which returns the value to aggregate\
+    (default: the record itself)
+    :param timestamp: one-argument function which returns the timestamp of a\
+    record (default: None)
+    """
+    def __init__(self, size, aggregate='sum', key=None, timestamp=None):
+        super(SlidingWindow, self).__init__(size, aggregate, key, timestamp)
+
+    def __by_count(self, key):
+        agg = self._aggregator()
+        window = deque()
+        for x in self.upstream:
+            v = key(x)
+            window.append(v)
+            agg.add(v)
+            if len(window) > self.size:
+                agg.remove(window.popleft())
+            yield agg.value()
+
+    def __by_time(self, key, timestamp):
+        agg = self._aggregator()
+        window = deque()
+        for x in self.upstream:
+            t = timestamp(x)
+            v = key(x)
+            window.append((t, v))
+            agg.add(v)
+            while not window[0][0] > t - self.size:
+                agg.remove(window.popleft()[1])
+            yield (t, agg.value())
+
+    def _initialize(self):
+        (key, timestamp) = self._extractors()
+        if timestamp is None:
+            return self.__by_count(key)
+        return self.__by_time(key, timestamp)
+
+
+class Sample(Pipe):
+    """Keep each record with probability ``fraction``. The number of records
+    to skip until the next kept one is drawn from a geometric distribution,
+    so skipped records cost no function call.
+
+    :param fraction: probability to keep a record
+    :param seed: seed of the random number generator (default: None)
+    """
+    def __init__(self, fraction, seed=None):
+        super(Sample, self).__init__()
+        self.fraction = fraction
+        self.seed = seed
+
+    def _initialize(self):
+        if self.fraction >= 1:
+            for x in self.upstream:
+                yield x
+            return
+        if self.fraction <= 0:
+            return
+        rng = random.Random(self.seed)
+        log_q = math.log(1.0 - self.fraction)
+        it = iter(self.upstream)
+        while True:
+            skip = int(math.log(1.0 - rng.random()) / log_q)
+            x = next(itertools.islice(it, skip, skip + 1), _MISSING)
+            if x is _MISSING:
+                return
+            yield x
+
+
+class Reservoir(Pipe):
+    """Yield a uniform random sample of ``k`` records, in upstream order, once
+    the upstream is exhausted. Implemented with Algorithm L, which skips
+    records between replacements without looking at them.
+
+    :param k: sample size
+    :param seed: seed of the random number generator (default: None)
+    """
+    def __init__(self, k, seed=None):
+        super(Reservoir, self).__init__()
+        self.k = k
+        self.seed = seed
+
+    def _initialize(self):
+        k = self.k
+        it = iter(self.upstream)
+        reservoir = list(enumerate(itertools.islice(it, k)))
+        if len(reservoir) == k and k > 0:
+            rng = random.Random(self.seed)
+            w = math.exp(math.log(1.0 - rng.random()) / k)
+            i = k - 1
+            while True:
+                skip = int(math.log(1.0 - rng.random()) / math.log(1.0 - w))
+                x = next(itertools.islice(it, skip, skip + 1), _MISSING)
+                if x is _MISSING:
+                    break
+                i += skip + 1
+                reservoir[rng.randrange(k)] = (i, x)
+                w *= math.exp(math.log(1.0 - rng.random()) / k)
+            reservoir.sort(key=operator.itemgetter(0))
+        for (_, x) in reservoir:
             yield x
+
+
+class _SortedRun(object):
+    """Sorted array of 64-bit hashes in a file, searched through ``mmap``.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.__file = open(name, 'rb')
+        if os.path.getsize(name) == 0:
+            self.__mmap = None
+            self.values = ()
+        else:
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+            self.values = memoryview(self.__mmap).cast('Q')
+
+    def __contains__(self, h):
+        i = bisect_left(self.values, h)
+        return i < len(self.values) and self.values[i] == h
+
+    def close(self):
+        if self.__mmap is not None:
+            self.values.release()
+            self.__mmap.close()
+        self.__file.close()
+        os.remove(self.name)
+
+
+class _SpillingHashSet(object):
+    """Set of 64-bit hashes split into partitions. When more than
+    ``memory_limit`` hashes are held in memory, the largest partition is
+    written to a new immutable sorted run on disk. Each partition keeps its
+    runs in tiers: when ``fanout`` runs of the same tier exist, they are
+    merged into one run of the next tier, so each hash is rewritten only
+    about ``log(n / memory_limit, fanout)`` times.
+    """
+    def __init__(self, memory_limit, directory=None, partitions=16,
+                 fanout=8):
+        self.memory_limit = memory_limit
+        self.fanout = fanout
+        self.__shift = 64 - int(math.log(partitions, 2))
+        self.__memory = [set() for _ in range(partitions)]
+        self.__runs = [[] for _ in range(partitions)]
+        self.__size = 0
+        self.__directory = tempfile.mkdtemp(dir=directory)
+        self.__count = 0
+
+    def add(self, h):
+        """add ``h``. return ``False`` if it was added before.
+        """
+        p = h >> self.__shift
+        mem = self.__memory[p]
+        if h in mem:
+            return False
+        for (_, run) in self.__runs[p]:
+            if h in run:
+                return False
+        mem.add(h)
+        self.__size += 1
+        if self.__size > self.memory_limit:
+            self.__spill()
+        return True
+
+    def __write(self, values):
+        self.__count += 1
+        name = os.path.join(self.__directory, '{}.run'.format(self.__count))
+        with open(name, 'wb') as f:
+            for chunk in iter(lambda: list(itertools.islice(values, 65536)),
+                              []):
+                array('Q', chunk).tofile(f)
+        return _SortedRun(name)
+
+    def __spill(self):
+        p = max(range(len(self.__memory)),
+                key=lambda i: len(self.__memory[i]))
+        runs = self.__runs[p]
+        runs.append((0, self.__write(iter(sorted(self.__memory[p])))))
+        self.__size -= len(self.__memory[p])
+        self.__memory[p] = set()
+        while len(runs) >= self.fanout and \
+                all(t == runs[-1][0] for (t, _) in runs[-self.fanout:]):
+            tier = runs[-1][0]
+            group = [run for (_, run) in runs[-self.fanout:]]
+            del runs[-self.fanout:]
+            runs.append((tier + 1, self.__write(
+                heapq.merge(*(run.values for run in group))
+            )))
+            for run in group:
+                run.close()
+
+    def close(self):
+        for runs in self.__runs:
+            for (_, run) in runs:
+                run.close()
+        self.__runs = [[] for _ in self.__runs]
+        shutil.rmtree(self.__directory, ignore_errors=True)
+
+
+class Distinct(Pipe):
+    """Drop records whose key has been seen before. In ``'exact'`` mode the
+    64-bit hashes of the keys are kept and spilled to sorted files in
+    ``directory`` when more than ``memory_limit`` are held in memory. In
+    ``'bloom'`` mode a Bloom filter of fixed size is used, which drops a
+    unique record with probability about ``error_rate``. ``.duplicates``
+    attribute indicates how many records were dropped.
+
+    :param key: one-argument function which returns the key of a record\
+    (default: the record itself)
+    :param mode: ``'exact'`` or ``'bloom'`` (default: ``'exact'``)
+    :param memory_limit: maximum number of hashes in memory in ``'exact'``\
+    mode (default: 10000000)
+    :param capacity: expected number of distinct keys in ``'bloom'`` mode\
+    (default: 100000000)
+    :param error_rate: false positive rate in ``'bloom'`` mode\
+    (default: 0.001)
+    :param directory: directory for spilled hashes (default: system temp)
+    """
+    def __init__(self, key=None, mode='exact', memory_limit=10000000,
+                 capacity=100000000, error_rate=0.001, directory=None):
+        super(Distinct, self).__init__()
+        if mode not in ('exact', 'bloom'):
+            raise ValueError('unknown mode \'{}\''.format(mode))
+        self.key = key
+        self.mode = mode
+        self.memory_limit = memory_limit
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.directory = directory
+        self.duplicates = 0
+
+    def _key(self):
+        return self.key or (lambda x: x)
+
+    def _initialize(self):
+        kf = self._key()
+        if self.mode == 'bloom':
+            seen = BloomFilter(self.capacity, self.error_rate)
+            for x in self.upstream:
+                if seen.add(kf(x)):
+                    yield x
+                else:
+                    self.duplicates += 1
+            return
+        seen = _SpillingHashSet(self.memory_limit, self.directory)
+        try:
+            for x in self.upstream:
+                if seen.add(_hash64(kf(x))):
+                    yield x
+                else:
+                    self.duplicates += 1
+        finally:
+            seen.close()
+
+
+class _RingBuffer(object):
+    """Bounded buffer with one producer and several consumers. ``put`` blocks
+    while the slowest live consumer is ``capacity`` items behind.
+
+    :param capacity: maximum number of items held at once
+    :param consumers: number of consumers
+    """
+    def __init__(self, capacity, consumers):
+        self.capacity = capacity
+        self.__items = [None] * capacity
+        self.__head = 0
+        self.__tails = [0] * consumers
+        self.__live = set(range(consumers))
+        self.__closed = False
+        self.__cond = threading.Condition()
+
+    def __lag(self):
+        if not self.__live:
+            return 0
+        return self.__head - min(self.__tails[i] for i in self.__live)
+
+    def put(self, item):
+        with self.__cond:
+            while self.__lag() >= self.capacity:
+                self.__cond.wait()
+            self.__items[self.__head % self.capacity] = item
+            self.__head += 1
+            self.__cond.notify_all()
+
+    def get(self, consumer):
+        """return the next item for ``consumer`` or ``None`` when the buffer
+        is closed and drained.
+        """
+        with self.__cond:
+            while self.__tails[consumer] == self.__head and \
+                    not self.__closed:
+                self.__cond.wait()
+            if self.__tails[consumer] == self.__head:
+                return None
+            item = self.__items[self.__tails[consumer] % self.capacity]
+            self.__tails[consumer] += 1
+            self.__cond.notify_all()
+            return item
+
+    def consume(self, consumer):
+        while True:
+            batch = self.get(consumer)
+            if batch is None:
+                return
+            for x in batch:
+                yield x
+
+    def detach(self, consumer):
+        """stop waiting for ``consumer``.
+        """
+        with self.__cond:
+            self.__live.discard(consumer)
+            self.__cond.notify_all()
+
+    def close(self):
+        with self.__cond:
+            self.__closed = True
+            self.__cond.notify_all()
+
+
+class _ForwardingOrigin(Origin):
+    """Origin which reads ``origin`` through ``generator`` and looks
+    attributes up on ``upstream``, so that e.g. ``field`` of the stage which
+    feeds ``origin`` is visible downstream. Used as the origin of ``Tee``
+    branches and of ``Exchange`` workers.
+    """
+    def __init__(self, upstream, origin, generator):
+        self.__forwarded = upstream
+        super(_ForwardingOrigin, self).__init__(origin, generator)
+
+    def __getattr__(self, name):
+        return getattr(self.__forwarded, name)
+
+
+class Tee(Pipe):
+    """Feed each upstream record to every branch in a single pass and yield it
+    downstream as well. Each branch is driven to completion on its own thread
+    and reads batches from a bounded ring buffer shared by all branches; the
+    upstream waits while the slowest branch is ``buffer_size`` batches behind.
+    An exception raised in a branch is re-raised by the ``Tee``.
+
+    :param branches: pipes fed by this ``Tee``. usually ending with a sink.
+    :param buffer_size: capacity of the ring buffer in batches (default: 16)
+    :param batch_size: number of records per batch (default: 256)
+    """
+    def __init__(self, *branches, **kwargs):
+        super(Tee, self).__init__()
+        self.branches = branches
+        self.buffer_size = kwargs.pop('buffer_size', 16)
+        self.batch_size = kwargs.pop('batch_size', 256)
+        if len(kwargs) != 0:
+            raise TypeError(
+                'unexpected keyword argument \'{}\''.format(
+                    next(iter(kwargs))
+                )
+            )
+
+    @staticmethod
+    def __drive(branch, ring, index, errors):
+        try:
+            for _ in branch:
+                pass
+        except Exception as e:
+            errors.append(e)
+        finally:
+            ring.detach(index)
+
+    def _initialize(self):
+        upstream = self.upstream
+        upstream.stream
+        ring = _RingBuffer(self.buffer_size, len(self.branches))
+        errors = []
+        threads = []
+        for (i, branch) in enumerate(self.branches):
+            branch.upstream = _ForwardingOrigin(
+                upstream, ring, lambda r, i=i: r.consume(i)
+            )
+            t = threading.Thread(target=self.__drive,
+                                 args=(branch, ring, i, errors))
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        batch = []
+        try:
+            for x in upstream:
+                batch.append(x)
+                yield x
+                if len(batch) >= self.batch_size:
+                    ring.put(batch)
+                    batch = []
+                    if len(errors) != 0:
+                        break
+        finally:
+            if len(batch) != 0 and len(errors) == 0:
+                ring.put(batch)
+            ring.close()
+            for t in threads:
+                t.join()
+        if len(errors) != 0:
+            raise errors[0]
+
+
+class TopK(Pipe):
+    """Yield the first ``k`` records in the order of
+    ``sorted(upstream, key=key, reverse=reverse)``, i.e. the ``k`` smallest
+    (largest if ``reverse``) records, keeping only ``k`` records in a heap.
+    Ties are broken by the arrival order, as by the stable sort.
+    ``.result`` attribute is the list of the records yielded.
+
+    :param k: number of records
+    :param key: one-argument function which returns the sort key of a record\
+    (default: the record itself)
+    :param reverse: take the largest records (default: False)
+    """
+    def __init__(self, k, key=None, reverse=False):
+        super(TopK, self).__init__()
+        self.k = k
+        self.key = key
+        self.reverse = reverse
+        self.result = []
+
+    def _key(self):
+        return self.key
+
+    def __select(self, records, key):
+        if self.reverse:
+            return heapq.nlargest(self.k, records, key)
+        return heapq.nsmallest(self.k, records, key)
+
+    def _initialize(self):
+        self.result = self.__select(self.upstream, self._key())
+        for x in self.result:
+            yield x
+
+    def merge(self, *others):
+        """return the top ``k`` records of the results of this instance and
+        ``others``, e.g. ``TopK`` of other partitions. Ties are broken by the
+        order of the instances, then by the arrival order.
+
+        :param others: ``TopK`` instances with the same parameters
+        """
+        return self.__select(
+            itertools.chain(self.result, *(o.result for o in others)),
+            self._key()
+        )
@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import marshal
+import multiprocessing
+import os
+import pickle
+import struct
+import threading
+import time
+import traceback
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+from . core import Pipe
+from . operator import _MISSING, _ForwardingOrigin
+
+
+_job = None
+
+
+def _count(pipeline):
+    count = 0
+    for _ in pipeline:
+        count += 1
+    return count
+
+
+def _init_worker(template, result):
+    global _job
+    _job = (template, result)
+
+
+def _run_one(binding):
+    (template, result) = _job
+    return result(template.bind(binding))
+
+
+def _context():
+    if not hasattr(multiprocessing, 'get_context'):
+        return multiprocessing
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def _fork_context():
+    if not hasattr(multiprocessing, 'get_context') or \
+            'fork' not in multiprocessing.get_all_start_methods():
+        raise RuntimeError('fork start method is required')
+    return multiprocessing.get_context('fork')
+
+
+def run_parallel(template, bindings, processes=None, result=None,
+                 chunksize=1):
+    """Bind ``template`` to each of ``bindings`` and run the pipelines in
+    worker processes. return the list of results in the order of
+    ``bindings``. Where ``fork`` is available the template is inherited by
+    the workers, so it may hold lambdas; otherwise it must be picklable.
+
+    :param template: ``kisell.util.Template`` instance
+    :param bindings: iterable of bindings such as file names
+    :param processes: number of worker processes (default: number of CPUs).\
+    ``1`` runs the pipelines in this process.
+    :param result: one-argument function which takes a pipeline, runs it and\
+    returns its result (default: number of records the pipeline yields)
+    :param chunksize: number of bindings sent to a worker at once\
+    (default: 1)
+    """
+    result = result or _count
+    if processes == 1:
+        return [result(template.bind(b)) for b in bindings]
+    pool = _context().Pool(processes, _init_worker, (template, result))
+    try:
+        res = pool.map(_run_one, bindings, chunksize)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return res
+
+
+_BATCH = 0
+_PICKLED_BATCH = 1
+_END = 2
+_ERROR = 3
+_FIELD = 4
+
+
+class _SharedRing(object):
+    """Single-producer single-consumer ring of ``slots`` slots of
+    ``slot_size`` bytes in shared memory. A message longer than a slot spans
+    several slots.
+    """
+    _HEADER = struct.Struct('<BBI')
+
+    def __init__(self, ctx, slots, slot_size):
+        if shared_memory is None:
+            raise RuntimeError('multiprocessing.shared_memory is required')
+        if slot_size <= self._HEADER.size:
+            raise ValueError('slot_size is too small')
+        self.slots = slots
+        self.slot_size = slot_size
+        self.shm = shared_memory.SharedMemory(create=True,
+                                              size=slots * slot_size)
+        self.free = ctx.Semaphore(slots)
+        self.filled = ctx.Semaphore(0)
+        self.__index = 0
+
+    def send(self, kind, payload):
+        buf = self.shm.buf
+        size = self.slot_size - self._HEADER.size
+        view = memoryview(payload)
+        pos = 0
+        while True:
+            chunk = view[pos:pos + size]
+            pos += len(chunk)
+            more = 1 if pos < len(view) else 0
+            self.free.acquire()
+            offset = self.__index * self.slot_size
+            self._HEADER.pack_into(buf, offset, kind, more, len(chunk))
+            start = offset + self._HEADER.size
+            buf[start:start + len(chunk)] = chunk
+            self.__index = (self.__index + 1) % self.slots
+            self.filled.release()
+            if not more:
+                return
+
+    def __wait(self, process):
+        while not self.filled.acquire(timeout=0.1):
+            if process.is_alive():
+                continue
+            if self.filled.acquire(False):
+                return
+            raise RuntimeError(
+                'worker process exited with code {}'.format(process.exitcode)
+            )
+
+    def recv(self, process, block=True):
+        """return the next ``(kind, payload)``, or None if ``block`` is False
+        and nothing has been sent. raise ``RuntimeError`` if ``process``
+        exits before sending it.
+        """
+        if block:
+            self.__wait(process)
+        elif not self.filled.acquire(False):
+            if process.is_alive():
+                return None
+            self.__wait(process)
+        buf = self.shm.buf
+        parts = []
+        while True:
+            offset = self.__index * self.slot_size
+            (kind, more, size) = self._HEADER.unpack_from(buf, offset)
+            start = offset + self._HEADER.size
+            parts.append(bytes(buf[start:start + size]))
+            self.__index = (self.__index + 1) % self.slots
+            self.free.release()
+            if not more:
+                return (kind, b''.join(parts))
+            self.__wait(process)
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _encode(batch):
+    try:
+        return (_BATCH, marshal.dumps(batch))
+    except ValueError:
+        return (_PICKLED_BATCH, pickle.dumps(batch, pickle.HIGHEST_PROTOCOL))
+
+
+def _decode(kind, payload):
+    if kind == _BATCH:
+        return marshal.loads(payload)
+    return pickle.loads(payload)
+
+
+def _send_error(ring, e):
+    try:
+        payload = pickle.dumps(e, pickle.HIGHEST_PROTOCOL)
+        pickle.loads(payload)
+    except Exception:
+        payload = pickle.dumps(RuntimeError(traceback.format_exc()))
+    ring.send(_ERROR, payload)
+
+
+def _boundary_worker(upstream, ring, batch_size):
+    try:
+        upstream.stream
+        try:
+            field = upstream.field
+        except AttributeError:
+            field = None
+        ring.send(_FIELD, pickle.dumps(field, pickle.HIGHEST_PROTOCOL))
+        it = iter(upstream)
+        while True:
+            batch = list(itertools.islice(it, batch_size))
+            if len(batch) == 0:
+                break
+            ring.send(*_encode(batch))
+        ring.send(_END, b'')
+    except Exception as e:
+        _send_error(ring, e)
+    finally:
+        ring.close()
+
+
+class ProcessBoundary(Pipe):
+    """Run the upstream in a forked process and pass its records on in
+    batches through a ring buffer in shared memory. Each group of stages
+    between two boundaries runs in its own process, which pipelines heavy
+    stages across cores. The upstream stages are initialized, iterated and
+    finalized in the worker process only, so attributes they update (e.g.
+    ``Count.count``) are not visible here; ``field`` of the upstream is sent
+    from the worker. Records should consist of builtin types; other records
+    are pickled. Exceptions raised upstream are re-raised here. Requires
+    ``fork`` and ``multiprocessing.shared_memory``.
+
+    :param batch_size: number of records per batch (default: 1024)
+    :param slots: number of slots of the ring buffer (default: 8)
+    :param slot_size: size of a slot in bytes (default: 1048576)
+    """
+    _detached_upstream = True
+
+    def __init__(self, batch_size=1024, slots=8, slot_size=1 << 20):
+        super(ProcessBoundary, self).__init__()
+        self.batch_size = batch_size
+        self.slots = slots
+        self.slot_size = slot_size
+        self.__process = None
+        self.__ring = None
+        self.__field = _MISSING
+
+    def __start(self):
+        if self.__process is not None:
+            return
+        ctx = _fork_context()
+        self.__ring = _SharedRing(ctx, self.slots, self.slot_size)
+        self.__process = ctx.Process(
+            target=_boundary_worker,
+            args=(self.upstream, self.__ring, self.batch_size)
+        )
+        self.__process.start()
+
+    def __stop(self):
+        if self.__process is None:
+            return
+        if self.__process.is_alive():
+            self.__process.terminate()
+        self.__process.join()
+        self.__ring.close(unlink=True)
+        self.__process = None
+
+    def __receive(self):
+        (kind, payload) = self.__ring.recv(self.__process)
+        if kind == _ERROR:
+            raise pickle.loads(payload)
+        return (kind, payload)
+
+    def __receive_field(self):
+        if self.__field is _MISSING:
+            self.__start()
+            self.__field = pickle.loads(self.__receive()[1])
+        return self.__field
+
+    def __getattr__(self, name):
+        if name == 'field':
+            field = self.__receive_field()
+            if field is None:
+                raise AttributeError(
+                    '\'{}\' object has no attribute \'field\''.format(
+                        type(self).__name__
+                    )
+                )
+            return field
+        return super(ProcessBoundary, self).__getattr__(name)
+
+    def __iterate(self):
+        try:
+            self.__receive_field()
+            while True:
+                (kind, payload) = self.__receive()
+                if kind == _END:
+                    break
+                for x in _decode(kind, payload):
+                    yield x
+        finally:
+            self.__stop()
+
+    def _initialize(self):
+        self.__start()
+        return self.__iterate()
+
+    def _finalize(self):
+        self.__stop()
+
+
+def pipelined(*groups, **kwargs):
+    """Chain ``groups`` of stages with a ``ProcessBoundary`` after each group
+    but the last, so that each group runs in its own process. return the
+    last stage.
+
+    :param groups: stages or lists of stages; the first one starts with an\
+    Origin
+    :param kwargs: keyword arguments of ``ProcessBoundary``
+    """
+    res = None
+    for (i, group) in enumerate(groups):
+        if i != 0:
+            res = res.then(ProcessBoundary(**kwargs))
+        for s in (group if isinstance(group, (list, tuple)) else (group,)):
+            res = s if res is None else res.then(s)
+    return res
+
+
+class _Parent(object):
+    """Stand-in of the driver process for ``_SharedRing.recv`` in a worker.
+    """
+    exitcode = None
+
+    def __init__(self):
+        self.pid = os.getpid()
+
+    def is_alive(self):
+        return os.getppid() == self.pid
+
+
+def _receive(ring, parent):
+    while True:
+        (kind, payload) = ring.recv(parent)
+        if kind == _END:
+            return
+        for x in _decode(kind, payload):
+            yield x
+
+
+def _exchange_worker(source, pipe, inbox, outbox, batch_size):
+    try:
+        pipe.upstream = source
+        it = iter(pipe)
+        while True:
+            batch = list(itertools.islice(it, batch_size))
+            if len(batch) == 0:
+                break
+            outbox.send(*_encode(batch))
+        outbox.send(_END, b'')
+    except Exception as e:
+        _send_error(outbox, e)
+    finally:
+        inbox.close()
+        outbox.close()
+
+
+class Exchange(Pipe):
+    """Hash-partition upstream records by ``key`` across ``workers`` forked
+    processes. Each worker runs its own copy of ``pipe`` over its partition,
+    so records with the same key are processed by the same copy, and the
+    outputs of the workers are merged into this stream in no particular
+    order. As with ``ProcessBoundary``, attributes of ``pipe`` updated in the
+    workers are not visible here. Requires ``fork`` and
+    ``multiprocessing.shared_memory``.
+
+    :param pipe: pipe or chain of pipes run by each worker
+    :param key: one-argument function which returns the hashable key of a\
+    record (default: the record itself)
+    :param workers: number of worker processes (default: number of CPUs)
+    :param batch_size: number of records per batch (default: 1024)
+    :param slots: number of slots of each ring buffer (default: 8)
+    :param slot_size: size of a slot in bytes (default: 1048576)
+    """
+    def __init__(self, pipe, key=None, workers=None, batch_size=1024,
+                 slots=8, slot_size=1 << 20):
+        super(Exchange, self).__init__()
+        self.pipe = pipe
+        self.key = key
+        self.workers = workers
+        self.batch_size = batch_size
+        self.slots = slots
+        self.slot_size = slot_size
+
+    def _key(self):
+        return self.key or (lambda x: x)
+
+    def __feed(self, records, inboxes, stop, errors):
+        batch_size = self.batch_size
+        n = len(inboxes)
+        batches = [[] for _ in inboxes]
+        try:
+            kf = self._key()
+            for x in records:
+                if stop.is_set():
+                    return
+                i = hash(kf(x)) % n
+                batches[i].append(x)
+                if len(batches[i]) >= batch_size:
+                    inboxes[i].send(*_encode(batches[i]))
+                    batches[i] = []
+            for (i, batch) in enumerate(batches):
+                if len(batch) != 0:
+                    inboxes[i].send(*_encode(batch))
+        except Exception as e:
+            errors.append(e)
+        if not stop.is_set():
+            for inbox in inboxes:
+                inbox.send(_END, b'')
+
+    def __iterate(self):
+        it = iter(self.upstream)
+        first = next(it, _MISSING)
+        records = it if first is _MISSING else itertools.chain([first], it)
+        ctx = _fork_context()
+        n = self.workers or ctx.cpu_count()
+        parent = _Parent()
+        inboxes = []
+        outboxes = []
+        processes = []
+        stop = threading.Event()
+        errors = []
+        feeder = threading.Thread(target=self.__feed,
+                                  args=(records, inboxes, stop, errors))
+        feeder.daemon = True
+        try:
+            for _ in range(n):
+                inboxes.append(_SharedRing(ctx, self.slots, self.slot_size))
+                outboxes.append(_SharedRing(ctx, self.slots, self.slot_size))
+                source = _ForwardingOrigin(
+                    self.upstream, inboxes[-1], lambda r: _receive(r, parent)
+                )
+                p = ctx.Process(target=_exchange_worker,
+                                args=(source, self.pipe, inboxes[-1],
+                                      outboxes[-1], self.batch_size))
+                p.start()
+                processes.append(p)
+            feeder.start()
+            active = list(range(n))
+            while len(active) != 0:
+                idle = True
+                for i in list(active):
+                    msg = outboxes[i].recv(processes[i], block=False)
+                    if msg is None:
+                        continue
+                    idle = False
+                    (kind, payload) = msg
+                    if kind == _END:
+                        active.remove(i)
+                    elif kind == _ERROR:
+                        raise pickle.loads(payload)
+                    else:
+                        for x in _decode(kind, payload):
+                            yield x
+                if idle:
+                    time.sleep(0.001)
+            feeder.join()
+            if len(errors) != 0:
+                raise errors[0]
+        finally:
+            stop.set()
+            for p in processes:
+                if p.is_alive():
+                    p.terminate()
+                p.join()
+            while feeder.is_alive():
+                for inbox in inboxes:
+                    inbox.free.release()
+                feeder.join(0.01)
+            it.close()
+            for ring in inboxes + outboxes:
+                ring.close(unlink=True)
+
+    def _initialize(self):
+        return self.__iterate()
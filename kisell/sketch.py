@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+import hashlib
+import heapq
+import math
+import random
+import struct
+
+
+def _digest(value):
+    if isinstance(value, bytes):
+        b = value
+    elif isinstance(value, str):
+        b = value.encode('utf-8')
+    else:
+        b = repr(value).encode('utf-8')
+    return hashlib.md5(b).digest()
+
+
+def _hash64(value):
+    """return 64-bit hash of ``value`` which is stable across processes.
+    """
+    return struct.unpack('>Q', _digest(value)[:8])[0]
+
+
+class HyperLogLog(object):
+    """HyperLogLog distinct counter. Uses ``2 ** p`` one-byte registers; the
+    relative error is about ``1.04 / sqrt(2 ** p)``.
+
+    :param p: number of index bits (default: 14)
+    """
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = bytearray(1 << p)
+
+    def update(self, values):
+        """add ``values`` to the sketch.
+
+        :param values: iterable of hashable values
+        """
+        registers = self.registers
+        shift = 64 - self.p
+        mask = (1 << shift) - 1
+        for v in values:
+            h = _hash64(v)
+            j = h >> shift
+            rho = shift - (h & mask).bit_length() + 1
+            if rho > registers[j]:
+                registers[j] = rho
+
+    def merge(self, other):
+        """merge ``other`` into this sketch and return this sketch.
+        """
+        if other.p != self.p:
+            raise ValueError('cannot merge sketches of different precision')
+        self.registers = bytearray(
+            max(a, b) for (a, b) in zip(self.registers, other.registers)
+        )
+        return self
+
+    @property
+    def count(self):
+        """estimated number of distinct values.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        e = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        if e <= 2.5 * m:
+            zeros = self.registers.count(0)
+            if zeros != 0:
+                e = m * math.log(float(m) / zeros)
+        return int(round(e))
+
+
+class SpaceSaving(object):
+    """SpaceSaving heavy hitter summary. Monitors at most ``k`` values; the
+    count of a monitored value overestimates its frequency by at most its
+    ``errors`` entry.
+
+    :param k: number of monitored values (default: 100)
+    """
+    def __init__(self, k=100):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        self.__heap = []
+        self.__seq = 0
+
+    def __push(self, value):
+        self.__seq += 1
+        heapq.heappush(self.__heap, (self.counts[value], self.__seq, value))
+
+    def __pop_min(self):
+        while True:
+            (c, _, value) = heapq.heappop(self.__heap)
+            if value not in self.counts:
+                continue
+            if self.counts[value] != c:
+                self.__push(value)
+                continue
+            return (value, c)
+
+    def update(self, values):
+        """add ``values`` to the summary.
+
+        :param values: iterable of hashable values
+        """
+        counts = self.counts
+        for (value, c) in Counter(values).items():
+            if value in counts:
+                counts[value] += c
+            elif len(counts) < self.k:
+                counts[value] = c
+                self.errors[value] = 0
+                self.__push(value)
+            else:
+                (evicted, c_min) = self.__pop_min()
+                del counts[evicted]
+                del self.errors[evicted]
+                counts[value] = c_min + c
+                self.errors[value] = c_min
+                self.__push(value)
+
+    def merge(self, other):
+        """merge ``other`` into this summary and return this summary.
+        """
+        def floor(s):
+            return min(s.counts.values()) if len(s.counts) >= s.k else 0
+        (fa, fb) = (floor(self), floor(other))
+        counts = {}
+        errors = {}
+        for v in set(self.counts).union(other.counts):
+            counts[v] = self.counts.get(v, fa) + other.counts.get(v, fb)
+            errors[v] = self.errors.get(v, fa) + other.errors.get(v, fb)
+        kept = heapq.nlargest(self.k, counts, key=counts.__getitem__)
+        self.counts = dict((v, counts[v]) for v in kept)
+        self.errors = dict((v, errors[v]) for v in kept)
+        self.__heap = []
+        for v in kept:
+            self.__push(v)
+        return self
+
+    def top(self, n=None):
+        """return the list of ``(value, count)`` in descending order of
+        count.
+
+        :param n: number of values (default: all monitored values)
+        """
+        res = sorted(self.counts.items(), key=lambda x: -x[1])
+        return res if n is None else res[:n]
+
+
+class KLL(object):
+    """KLL quantile sketch. Keeps ``O(k)`` values; ranks are approximated
+    within about ``1.7 / k`` of the number of values.
+
+    :param k: accuracy parameter (default: 200)
+    :param seed: seed of the random number generator (default: None)
+    """
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.compactors = [[]]
+        self.__rng = random.Random(seed)
+        self.__size = 0
+        self.__max_size = self.__capacity(0)
+
+    def __capacity(self, h):
+        depth = len(self.compactors) - h - 1
+        return int(math.ceil(self.k * (2.0 / 3.0) ** depth)) + 1
+
+    def __grow(self):
+        self.compactors.append([])
+        self.__max_size = sum(
+            self.__capacity(h) for h in range(len(self.compactors))
+        )
+
+    def __compress(self):
+        for h in range(len(self.compactors)):
+            if len(self.compactors[h]) >= self.__capacity(h):
+                if h + 1 >= len(self.compactors):
+                    self.__grow()
+                c = self.compactors[h]
+                last = c.pop() if len(c) % 2 == 1 else None
+                c.sort()
+                self.compactors[h + 1].extend(c[self.__rng.randint(0, 1)::2])
+                self.compactors[h] = [] if last is None else [last]
+                self.__size = sum(len(x) for x in self.compactors)
+                if self.__size < self.__max_size:
+                    break
+
+    def update(self, values):
+        """add ``values`` to the sketch.
+
+        :param values: iterable of comparable values
+        """
+        for v in values:
+            self.compactors[0].append(v)
+            self.n += 1
+            self.__size += 1
+            if self.__size >= self.__max_size:
+                self.__compress()
+
+    def merge(self, other):
+        """merge ``other`` into this sketch and return this sketch.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.__grow()
+        for (h, c) in enumerate(other.compactors):
+            self.compactors[h].extend(c)
+        self.n += other.n
+        self.__size = sum(len(x) for x in self.compactors)
+        while self.__size >= self.__max_size:
+            self.__compress()
+        return self
+
+    def quantile(self, q):
+        """return the estimated ``q``-quantile or ``None`` if the sketch is
+        empty.
+
+        :param q: float between 0 and 1
+        """
+        items = sorted(
+            (v, 1 << h) for (h, c) in enumerate(self.compactors) for v in c
+        )
+        if len(items) == 0:
+            return None
+        total = sum(w for (_, w) in items)
+        cum = 0
+        for (v, w) in items:
+            cum += w
+            if cum >= q * total:
+                return v
+        return items[-1][0]
+
+
+class BloomFilter(object):
+    """Bloom filter sized for ``capacity`` values at false positive rate
+    ``error_rate``. Its memory is fixed at construction.
+
+    :param capacity: expected number of values
+    :param error_rate: false positive rate at ``capacity`` values\
+    (default: 0.001)
+    """
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.m = max(8, int(math.ceil(
+            -capacity * math.log(error_rate) / (math.log(2) ** 2)
+        )))
+        self.k = max(1, int(round(float(self.m) / capacity * math.log(2))))
+        self.bits = bytearray((self.m + 7) // 8)
+
+    def add(self, value):
+        """add ``value``. return ``False`` if ``value`` was (probably) added
+        before, ``True`` otherwise.
+        """
+        (h1, h2) = struct.unpack('>QQ', _digest(value))
+        bits = self.bits
+        m = self.m
+        new = False
+        for i in range(self.k):
+            j = (h1 + i * h2) % m
+            b = 1 << (j & 7)
+            if not bits[j >> 3] & b:
+                bits[j >> 3] |= b
+                new = True
+        return new
+
+    def __contains__(self, value):
+        (h1, h2) = struct.unpack('>QQ', _digest(value))
+        return all(
+            self.bits[j >> 3] & (1 << (j & 7))
+            for j in ((h1 + i * h2) % self.m for i in range(self.k))
+        )
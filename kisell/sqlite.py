@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+
+from . core import Origin, Pipe
+
+
+def _quote(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def _connect(database):
+    if isinstance(database, sqlite3.Connection):
+        return (database, False)
+    return (sqlite3.connect(database, check_same_thread=False), True)
+
+
+class SQLiteWriter(Pipe):
+    """Insert records into ``table`` of ``database``. If the table does not
+    exist, it is created with the columns named after the ``field`` of the
+    upstream. Records are inserted with ``executemany`` in batches of
+    ``batch_size``, each in its own transaction. On each iteration, it
+    consumes one record and yields ``None``.
+
+    :param database: file name or ``sqlite3.Connection``
+    :param table: table name
+    :param batch_size: number of records per transaction (default: 10000)
+    :param pragmas: dict of pragmas such as\
+    ``{'journal_mode': 'WAL', 'synchronous': 'NORMAL'}`` (default: None)
+    """
+    def __init__(self, database, table, batch_size=10000, pragmas=None):
+        super(SQLiteWriter, self).__init__()
+        self.database = database
+        self.table = table
+        self.batch_size = batch_size
+        self.pragmas = pragmas or {}
+        self.connection = None
+        self.__close = False
+
+    def __create_table(self):
+        field = self.field
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS {} ({})'.format(
+                _quote(self.table), ', '.join(_quote(f) for f in field)
+            )
+        )
+        return 'INSERT INTO {} VALUES ({})'.format(
+            _quote(self.table), ', '.join('?' for _ in field)
+        )
+
+    def __insert(self, statement, batch):
+        with self.connection:
+            self.connection.executemany(statement, batch)
+
+    def _initialize(self):
+        (self.connection, self.__close) = _connect(self.database)
+        for (k, v) in self.pragmas.items():
+            self.connection.execute('PRAGMA {} = {}'.format(k, v))
+        statement = self.__create_table()
+        batch = []
+        try:
+            for x in self.upstream:
+                batch.append(x)
+                if len(batch) >= self.batch_size:
+                    self.__insert(statement, batch)
+                    batch = []
+                yield None
+        finally:
+            if len(batch) != 0:
+                self.__insert(statement, batch)
+
+    def _finalize(self):
+        if self.__close:
+            self.connection.close()
+
+
+class SQLiteOrigin(Origin):
+    """Stream the results of ``query`` on ``database`` as lists. The query
+    is executed on construction and the column names are exposed as
+    ``field``. Rows are fetched with ``fetchmany`` in batches of
+    ``batch_size``.
+
+    :param database: file name or ``sqlite3.Connection``
+    :param query: SQL query, or table name to read the whole table
+    :param parameters: parameters of the query (default: ``()``)
+    :param batch_size: number of rows per fetch (default: 1000)
+    """
+
+    @staticmethod
+    def __generator(cursor, batch_size):
+        for batch in iter(lambda: cursor.fetchmany(batch_size), []):
+            for x in batch:
+                yield list(x)
+
+    def __init__(self, database, query, parameters=(), batch_size=1000):
+        (self.connection, self.__close) = _connect(database)
+        if len(query.split()) == 1:
+            query = 'SELECT * FROM {}'.format(_quote(query))
+        cursor = self.connection.execute(query, parameters)
+        self.field = [d[0] for d in cursor.description]
+        self.batch_size = batch_size
+        super(SQLiteOrigin, self).__init__(
+            cursor, lambda c: self.__generator(c, self.batch_size)
+        )
+
+    def _finalize(self):
+        self.origin.close()
+        if self.__close:
+            self.connection.close()
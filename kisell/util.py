@@ -2,8 +2,111 @@
 
 from datetime import datetime
 from functools import reduce
+import itertools
+import queue
+import threading
 
-from . core import Origin, Pipe
+from . core import Base, EmptyPipeError, Origin, Pipe
+from . parallel import ProcessBoundary
+
+
+def walk(stream):
+    """Iterate ``stream`` and its upstreams from downstream to upstream. The
+    inner stages of ``CompoOrigin`` and ``CompoPipe`` are included.
+
+    :param stream: instance of ``kisell.core.Base``
+    """
+    s = stream
+    while s is not None:
+        yield s
+        if isinstance(s, Origin):
+            s = s.origin if isinstance(s.origin, Base) else None
+        else:
+            try:
+                s = s.upstream
+            except EmptyPipeError:
+                s = None
+
+
+def _batches(iterable, batch_size):
+    it = iter(iterable)
+    while True:
+        batch = list(itertools.islice(it, batch_size))
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+class _Failure(object):
+    def __init__(self, error):
+        self.error = error
+
+
+_END = object()
+
+
+class _BackgroundIterator(object):
+    """Iterate ``iterable`` on a daemon thread and pass its items to the
+    consumer in batches through a queue of at most ``maxsize`` batches.
+    Exceptions are re-raised on the consumer's thread.
+
+    :param iterable: iterable
+    :param maxsize: maximum number of batches waiting in the queue
+    :param batch_size: number of items per batch
+    """
+    def __init__(self, iterable, maxsize, batch_size):
+        self.__queue = queue.Queue(maxsize)
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__run,
+                                         args=(iterable, batch_size))
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __put(self, item):
+        while not self.__stop.is_set():
+            try:
+                self.__queue.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __run(self, iterable, batch_size):
+        it = iter(iterable)
+        try:
+            while True:
+                batch = list(itertools.islice(it, batch_size))
+                if len(batch) == 0:
+                    break
+                if not self.__put(batch):
+                    return
+            self.__put(_END)
+        except Exception as e:
+            self.__put(_Failure(e))
+        finally:
+            if hasattr(it, 'close'):
+                it.close()
+
+    def __iter__(self):
+        while True:
+            batch = self.__queue.get()
+            if batch is _END:
+                return
+            if isinstance(batch, _Failure):
+                raise batch.error
+            for x in batch:
+                yield x
+
+    def close(self):
+        """stop the thread and wait for it.
+        """
+        self.__stop.set()
+        while self.__thread.is_alive():
+            try:
+                self.__queue.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        self.__thread.join()
 
 
 class Attr(Pipe):
@@ -98,6 +201,67 @@ class Count(Pipe):
             self.count += 1
             yield x
 
+    def _get_state(self):
+        return self.count
+
+    def _set_state(self, state):
+        if state is not None:
+            self.count = state
+
+
+class Prefetch(Pipe):
+    """Run the upstream ahead of the consumer on a background thread, or a
+    forked process if ``process`` is true, and pass its records on in
+    batches through a queue of at most ``n`` batches. Exceptions raised
+    upstream are re-raised on the consumer's side. When the consumer stops
+    early the background worker is stopped. In a process, the upstream runs
+    behind a ``kisell.parallel.ProcessBoundary`` with ``n`` slots, so it is
+    initialized and finalized in the worker only.
+
+    :param n: maximum number of batches waiting in the queue
+    :param batch_size: number of records per batch (default: 256)
+    :param process: run the upstream in a forked process (default: False)
+    """
+    def __init__(self, n, batch_size=256, process=False):
+        super(Prefetch, self).__init__()
+        self.n = n
+        self.batch_size = batch_size
+        self.process = process
+        self.__boundary = None
+
+    @property
+    def _detached_upstream(self):
+        return self.process
+
+    def __getattr__(self, name):
+        if name == 'field' and self.process:
+            return self.__process_boundary().field
+        return super(Prefetch, self).__getattr__(name)
+
+    def __process_boundary(self):
+        if self.__boundary is None:
+            self.__boundary = ProcessBoundary(self.batch_size, self.n)
+            self.__boundary.upstream = self.upstream
+        return self.__boundary
+
+    def __iterate_thread(self):
+        background = _BackgroundIterator(self.upstream, self.n,
+                                         self.batch_size)
+        try:
+            for x in background:
+                yield x
+        finally:
+            background.close()
+
+    def __iterate_process(self):
+        for x in self.__process_boundary():
+            yield x
+
+    def _initialize(self):
+        if self.process:
+            return self.__iterate_process()
+        return self.__iterate_thread()
+
 
 class CompoOrigin(Origin):
     """Make Origin object consist of origin an
@@ -122,3 +286,38 @@ class CompoPipe(Pipe):
 
     def _initialize(self):
         return self.upstream
+
+
+class Template(object):
+    """Reusable description of a pipeline. A fresh pipeline is made each time
+    the template is bound, so one template serves any number of origins.
+    Binding calls every factory again: stages are not reset and reused,
+    because many of them hold per-run state or resources (e.g. ``Count`` or
+    ``FileWriteStream``). Building a few stages takes microseconds, much
+    less than opening and reading a file, so the time saved by
+    ``kisell.parallel.run_parallel`` comes from running bindings on several
+    cores, not from cheaper construction.
+
+    :param origin: one-argument function which takes the binding (e.g. a file\
+    name) and returns an Origin. classes such as ``DSVFileReader`` work as\
+    well.
+    :param pipes: one-argument functions which take the binding and return a\
+    Pipe
+    """
+    def __init__(self, origin, *pipes):
+        self.origin = origin
+        self.pipes = pipes
+
+    def bind(self, binding):
+        """return a new pipeline made from ``binding``.
+
+        :param binding: the argument passed to ``origin`` and ``pipes``
+        """
+        return reduce(
+            lambda x, y: x.then(y(binding)), self.pipes, self.origin(binding)
+        )
+
+    def __call__(self, binding):
+        """bind and run the pipeline. return the pipeline.
+        """
+        return self.bind(binding)()
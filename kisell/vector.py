@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import numpy
+
+from . core import Pipe
+from . util import _batches
+
+
+def _tolist(x):
+    return x.tolist() if isinstance(x, numpy.ndarray) else list(x)
+
+
+class VectorMap(Pipe):
+    """Collect records into batches of ``batch_size``, convert each batch to
+    a ``numpy.ndarray`` and call ``func`` once per batch. The results are
+    yielded one by one unless ``unbatch`` is False, in which case ``func``'s
+    return value is yielded as is.
+
+    :param func: one-argument function which takes an array of records
+    :param batch_size: number of records per batch (default: 4096)
+    :param dtype: dtype of the arrays (default: inferred by numpy)
+    :param unbatch: yield each element of the results (default: True)
+    """
+    def __init__(self, func, batch_size=4096, dtype=None, unbatch=True):
+        super(VectorMap, self).__init__()
+        self.func = func
+        self.batch_size = batch_size
+        self.dtype = dtype
+        self.unbatch = unbatch
+
+    def _initialize(self):
+        for batch in _batches(self.upstream, self.batch_size):
+            res = self.func(numpy.asarray(batch, dtype=self.dtype))
+            if self.unbatch:
+                for x in _tolist(res):
+                    yield x
+            else:
+                yield res
+
+
+class VectorFilter(Pipe):
+    """Filter records by a boolean mask which ``func`` computes from an array
+    of a batch of records. The records themselves are yielded unchanged.
+
+    :param func: one-argument function which takes an array of records and\
+    returns a boolean array of the same length
+    :param batch_size: number of records per batch (default: 4096)
+    :param dtype: dtype of the arrays (default: inferred by numpy)
+    """
+    def __init__(self, func, batch_size=4096, dtype=None):
+        super(VectorFilter, self).__init__()
+        self.func = func
+        self.batch_size = batch_size
+        self.dtype = dtype
+
+    def _initialize(self):
+        for batch in _batches(self.upstream, self.batch_size):
+            mask = self.func(numpy.asarray(batch, dtype=self.dtype))
+            for x in itertools.compress(batch, _tolist(mask)):
+                yield x
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from kisell import __version__, __author__, __description__
-from setuptools import setup
+from setuptools import find_packages, setup
 
 setup(
     name='kisell',
@@ -12,6 +12,7 @@ setup(
     description=__description__,
     long_description='',
     license='MIT',
-    packages=['kisell'],
-    install_requires=['future']
+    packages=find_packages(exclude=['tests', 'tests.*']),
+    install_requires=['future'],
+    extras_require={'numpy': ['numpy']}
 )
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+from kisell.core import Origin
+
+
+class Rows(Origin):
+    """Origin of ``rows`` which exposes ``field`` like a DSV reader.
+    """
+    def __init__(self, rows, field):
+        super(Rows, self).__init__(rows)
+        self.field = field
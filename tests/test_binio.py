@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from kisell import binio
+from kisell.core import Origin
+from tests import Rows
+
+
+class BinaryFileTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.name = os.path.join(self.tmpdir, 'records.kbin')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test__init__(self):
+        rows = [[str(i), u'あ' * (i % 5), i, None] for i in range(1000)]
+        for compression in (None, 'zlib'):
+            test = Rows(rows, ['a', 'b', 'c', 'd']) + \
+                binio.BinaryFileWriter(self.name, 64, compression)
+            test()
+            test = binio.BinaryFileReader(self.name)
+            self.assertEqual(test.field, ['a', 'b', 'c', 'd'])
+            self.assertEqual(list(test), rows)
+            self.assertTrue(test.closed)
+        (Origin(range(10)) + binio.BinaryFileWriter(self.name))()
+        self.assertIsNone(binio.BinaryFileReader(self.name).field)
+        self.assertEqual(list(binio.BinaryFileReader(self.name)),
+                         list(range(10)))
+        with self.assertRaises(ValueError):
+            binio.BinaryFileWriter(self.name, compression='lz4')
+        with open(self.name, 'w') as f:
+            f.write('a,b\n')
+        with self.assertRaises(binio.FormatError):
+            binio.BinaryFileReader(self.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from kisell import cache, operator
+from kisell.core import Origin
+from kisell.dsv.io import CSVFileReader
+from kisell.util import OnIterate
+
+_THRESHOLD = 0
+
+
+class CacheTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cachedir = os.path.join(self.tmpdir, 'cache')
+        self.src = os.path.join(self.tmpdir, 'src.csv')
+        with open(self.src, 'w') as f:
+            f.write('a,b\n')
+            for i in range(100):
+                f.write('{},{}\n'.format(i, i * 2))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def pipeline(self, pulled, threshold=50, max_size=1 << 30):
+        return CSVFileReader(self.src) + OnIterate(pulled.append) + \
+            operator.Filter(lambda x: int(x[0]) >= threshold) + \
+            cache.Cache(self.cachedir, max_size)
+
+    def test__init__(self):
+        pulled = []
+        test = self.pipeline(pulled)
+        self.assertFalse(test.hit)
+        expected = [[str(i), str(i * 2)] for i in range(50, 100)]
+        self.assertEqual(list(test), expected)
+        self.assertEqual(len(pulled), 100)
+        pulled = []
+        test = self.pipeline(pulled)
+        self.assertTrue(test.hit)
+        self.assertEqual(test.field, ['a', 'b'])
+        self.assertEqual(list(test), expected)
+        self.assertEqual(pulled, [])
+        self.assertFalse(self.pipeline(pulled, 60).hit)
+        time.sleep(0.01)
+        with open(self.src, 'a') as f:
+            f.write('100,200\n')
+        self.assertFalse(self.pipeline(pulled).hit)
+
+    def test_early_stop(self):
+        pulled = []
+        test = self.pipeline(pulled) + operator.Limit(3)
+        self.assertEqual(len(list(test)), 3)
+        self.assertFalse(self.pipeline(pulled).hit)
+        self.assertEqual(os.listdir(self.cachedir), [])
+
+    def test_eviction(self):
+        pulled = []
+        list(self.pipeline(pulled, 10, 1))
+        list(self.pipeline(pulled, 20, 1))
+        self.assertEqual(len(os.listdir(self.cachedir)), 1)
+        self.assertTrue(self.pipeline(pulled, 20).hit)
+
+    def test_function(self):
+        def pipeline(func):
+            return Origin([1, 2, 3]) + operator.Filter(func)
+        self.assertNotEqual(
+            cache.fingerprint(pipeline(lambda x, t=1: x > t)),
+            cache.fingerprint(pipeline(lambda x, t=2: x > t))
+        )
+        self.assertEqual(
+            cache.fingerprint(pipeline(lambda x, t=1: x > t)),
+            cache.fingerprint(pipeline(lambda x, t=1: x > t))
+        )
+        global _THRESHOLD
+        _THRESHOLD = 1
+        before = cache.fingerprint(pipeline(lambda x: x > _THRESHOLD))
+        _THRESHOLD = 2
+        after = cache.fingerprint(pipeline(lambda x: x > _THRESHOLD))
+        self.assertNotEqual(before, after)
+        pulled = []
+        for (t, expected) in ((50, 50), (60, 40)):
+            test = CSVFileReader(self.src) + OnIterate(pulled.append) + \
+                operator.Filter(lambda x, t=t: int(x[0]) >= t) + \
+                cache.Cache(self.cachedir)
+            self.assertFalse(test.hit)
+            self.assertEqual(len(list(test)), expected)
+
+    def test_unfingerprintable(self):
+        with self.assertRaises(cache.FingerprintError):
+            cache.fingerprint(Origin(x for x in [1, 2]))
+        self.assertEqual(cache.fingerprint(Origin([1, 2])),
+                         cache.fingerprint(Origin([1, 2])))
+        for data in ([1, 2], [3, 4]):
+            test = Origin(x for x in data) + cache.Cache(self.cachedir)
+            self.assertIsNone(test.entry)
+            self.assertFalse(test.hit)
+            self.assertEqual(list(test), data)
+        self.assertFalse(os.path.exists(self.cachedir))
+
+
+if __name__ == '__main__':
+    unittest.main()
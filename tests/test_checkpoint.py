@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from kisell import operator
+from kisell.checkpoint import Checkpoint
+from kisell.core import Origin
+from kisell.dsv.io import CSVFileReader, CSVFileWriter
+from kisell.io import FileWriteStream
+from kisell.util import Count
+
+
+class CheckpointTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.input = os.path.join(self.tmpdir, 'in.csv')
+        self.output = os.path.join(self.tmpdir, 'out.csv')
+        self.path = os.path.join(self.tmpdir, 'checkpoint')
+        with open(self.input, 'w') as f:
+            f.write('k,v\n')
+            for i in range(100):
+                f.write('{},{}\n'.format(i, i * 2))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def __pipeline(self, fail_at=None):
+        def f(x):
+            if x[0] == fail_at:
+                raise RuntimeError(x)
+            return x
+        self.count = Count()
+        return CSVFileReader(self.input) + operator.Map(f) + self.count + \
+            CSVFileWriter(self.output, resume=True)
+
+    def test_run(self):
+        checkpoint = Checkpoint(self.path, 10)
+        with self.assertRaises(RuntimeError):
+            checkpoint.run(self.__pipeline('57'))
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(checkpoint.load()['records'], 50)
+        checkpoint.run(self.__pipeline())
+        self.assertEqual(checkpoint.records, 101)
+        self.assertEqual(self.count.count, 100)
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.input) as f, open(self.output) as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_truncate(self):
+        with open(self.output, 'w') as f:
+            f.write('x\n')
+        test = FileWriteStream(self.output)
+        self.assertEqual(os.path.getsize(self.output), 0)
+        with self.assertRaises(ValueError):
+            test._set_state(2)
+        (Origin(['y']) + test)()
+        with open(self.output) as f:
+            self.assertEqual(f.read(), 'y\n')
+
+    def test_accumulate(self):
+        test = operator.Accumulate()
+        test._set_state(None)
+        for _ in Origin(range(5)) + test:
+            pass
+        resumed = operator.Accumulate()
+        resumed._set_state(test._get_state())
+        self.assertEqual(list(Origin(range(5, 8)) + resumed), [15, 21, 28])
+
+
+if __name__ == '__main__':
+    unittest.main()
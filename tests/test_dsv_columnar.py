@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests import Rows
+
+try:
+    import numpy
+    from kisell.dsv import columnar
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class NpyColumnTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.rows = [[str(i), str(i * 0.5), 'x'] for i in range(10)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_write_read(self):
+        out = os.path.join(self.tmpdir, 'out')
+        writer = columnar.NpyColumnWriter(out, ('a', 'b'),
+                                          {'a': 'i8'}, buffer_size=3)
+        for _ in Rows(self.rows, ['a', 'b', 'c']) + writer:
+            pass
+        self.assertEqual(writer.rows, 10)
+        self.assertEqual(sorted(os.listdir(out)),
+                         ['a.npy', 'b.npy', 'manifest.json'])
+        self.assertEqual(numpy.load(os.path.join(out, 'b.npy')).tolist(),
+                         [i * 0.5 for i in range(10)])
+        test = columnar.NpyColumnReader(out)
+        self.assertEqual(test.field, ['a', 'b'])
+        self.assertEqual(list(test), [[i, i * 0.5] for i in range(10)])
+        test = columnar.NpyColumnReader(out, 'b', batch_size=4)
+        self.assertEqual([len(c[0]) for c in test], [4, 4, 2])
+
+    def test_empty(self):
+        out = os.path.join(self.tmpdir, 'out')
+        for _ in Rows([], ['a']) + columnar.NpyColumnWriter(out):
+            pass
+        self.assertEqual(list(columnar.NpyColumnReader(out)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from kisell.dsv import io
+from kisell.dsv.index import DSVIndex
+from kisell.operator import Limit, Skip
+
+
+class PartitionedDSVFileWriterTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmpdir, 'src.csv')
+        with open(self.src, 'w') as f:
+            f.write('k,v\n')
+            for i in range(100):
+                f.write('{},{}\n'.format('abc'[i % 3], i))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test__init__(self):
+        name = os.path.join(self.tmpdir, 'out_{}.csv')
+        test = io.CSVFileReader(self.src) + io.PartitionedCSVFileWriter(
+            name, target_field='k', max_open=1, buffer_size=2
+        )
+        test()
+        self.assertEqual(test.partitions, set(['a', 'b', 'c']))
+        for (j, k) in enumerate('abc'):
+            with open(name.format(k)) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(lines[0], 'k,v')
+            self.assertEqual(lines[1:], [
+                '{},{}'.format(k, i) for i in range(j, 100, 3)
+            ])
+        with self.assertRaises(ValueError):
+            io.PartitionedCSVFileWriter(name)
+
+    def test_key(self):
+        name = os.path.join(self.tmpdir, 'mod_{}.csv')
+        test = io.CSVFileReader(self.src) + io.PartitionedCSVFileWriter(
+            name, key=lambda x: int(x[1]) % 2
+        )
+        test()
+        with open(name.format(1)) as f:
+            self.assertEqual(len(f.read().splitlines()), 51)
+
+
+class MultiDSVFileReaderTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, content):
+        with open(os.path.join(self.tmpdir, name), 'w') as f:
+            f.write(content)
+
+    def test__init__(self):
+        self.write('0.csv', 'a,b\n1,2\n3,4\n')
+        self.write('1.csv', '')
+        self.write('2.csv', 'a,b\n5,"6\n7"\n')
+        test = io.MultiCSVFileReader(os.path.join(self.tmpdir, '*.csv'))
+        self.assertEqual(test.field, ['a', 'b'])
+        self.assertEqual(list(test), [['1', '2'], ['3', '4'], ['5', '6\n7']])
+        self.write('3.csv', 'a,c\n8,9\n')
+        test = io.MultiCSVFileReader(os.path.join(self.tmpdir, '*.csv'))
+        with self.assertRaises(io.HeaderMismatchError):
+            list(test)
+
+    def test_resources(self):
+        self.write('0.csv', 'a,b\n1,2\n')
+        self.write('1.csv', 'a,b\n3,4\n')
+        threads = threading.active_count()
+        test = io.MultiCSVFileReader(os.path.join(self.tmpdir, '*.csv'))
+        self.assertEqual(threading.active_count(), threads)
+        self.assertEqual(list(test), [['1', '2'], ['3', '4']])
+        self.assertEqual(threading.active_count(), threads)
+        if os.path.isdir('/proc/self/fd'):
+            fds = [os.path.realpath(os.path.join('/proc/self/fd', x))
+                   for x in os.listdir('/proc/self/fd')]
+            self.assertEqual([x for x in fds if x.startswith(self.tmpdir)],
+                             [])
+
+
+class BytesDSVFileReaderTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.name = os.path.join(self.tmpdir, 'src.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test__init__(self):
+        content = u'a,b,c\n1,あ,x\n\n2,"い\nう","y""z"\r\n3,4,5\n'
+        for encoding in ('utf-8', 'cp932'):
+            with open(self.name, 'wb') as f:
+                f.write(content.encode(encoding))
+            test = io.BytesCSVFileReader(self.name, encoding)
+            self.assertEqual(test.field, ['a', 'b', 'c'])
+            res = list(test)
+            self.assertIsInstance(res[0], io.LazyRecord)
+            self.assertEqual(res[0].fields, [b'1', u'あ'.encode(encoding),
+                                             b'x'])
+            self.assertEqual(res[0][2], 'x')
+            self.assertEqual(res[0].fields[1], u'あ'.encode(encoding))
+            self.assertEqual(res, [
+                ['1', u'あ', 'x'], [], ['2', u'い\nう', 'y"z'],
+                ['3', '4', '5']
+            ])
+        with self.assertRaises(ValueError):
+            io.BytesDSVParse(',', 'utf-16')
+
+
+class DSVIndexTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.name = os.path.join(self.tmpdir, 'src.csv')
+        with open(self.name, 'w') as f:
+            f.write('a,b\n')
+            for i in range(1000):
+                f.write('{},"x\ny{}"\n'.format(i, i) if i % 7 == 0 else
+                        '{},{}\n'.format(i, i))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_build(self):
+        self.assertIsNone(DSVIndex.load(self.name))
+        index = DSVIndex.build(self.name, every=100)
+        self.assertEqual(index.records, 1000)
+        self.assertEqual(len(index.offsets), 10)
+        self.assertEqual(DSVIndex.load(self.name).offsets, index.offsets)
+        self.assertEqual(index.locate(550), (500, index.offsets[5]))
+        self.assertEqual(index.split(3),
+                         [(0, 300), (300, 300), (600, 400)])
+        with open(self.name, 'a') as f:
+            f.write('1000,1000\n')
+        self.assertIsNone(DSVIndex.load(self.name))
+
+    def test_skip(self):
+        DSVIndex.build(self.name, every=100)
+        test = io.CSVFileReader(self.name)
+        self.assertEqual(test.seek_record(250), 200)
+        test = io.CSVFileReader(self.name) + Skip(497) + Limit(4)
+        self.assertEqual([int(x[0]) for x in test], [497, 498, 499, 500])
+        self.assertEqual(test.field, ['a', 'b'])
+        test = io.CSVFileReader(self.name) + Skip(700)
+        self.assertEqual(list(test)[0], ['700', 'x\ny700'])
+
+
+if __name__ == '__main__':
+    unittest.main()
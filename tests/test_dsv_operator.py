@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from kisell.dsv import operator
+from tests import Rows
+
+
+class WindowTester(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [[str(t), str(v)] for (t, v) in
+                     [(0, 3), (1, 1), (2, 4), (3, 1), (7, 5)]]
+
+    def tearDown(self):
+        pass
+
+    def test_tumbling(self):
+        test = Rows(self.rows, ['t', 'v']) + \
+            operator.TumblingWindow(2, 'v', 'max')
+        self.assertEqual(list(test), [3.0, 4.0, 5.0])
+        test = Rows(self.rows, ['t', 'v']) + \
+            operator.TumblingWindow(5, 'v', 'sum', time_field='t')
+        self.assertEqual(list(test), [(0.0, 9.0), (5.0, 5.0)])
+        with self.assertRaises(ValueError):
+            list(Rows(self.rows, ['t', 'v']) +
+                 operator.TumblingWindow(2, '.*'))
+
+    def test_sliding(self):
+        test = Rows(self.rows, ['t', 'v']) + \
+            operator.SlidingWindow(3, 'v', 'mean', time_field='t')
+        self.assertEqual([v for (_, v) in test], [3.0, 2.0, 8.0 / 3, 2.0, 5.0])
+
+
+class MapTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        rows = [['a', 'b', '1'], ['b', 'a', '2'], ['a', 'a', '3']]
+        test = operator.Map(str.upper, ('x', 'y'), memoize=True)
+        self.assertEqual(list(Rows(rows, ['x', 'y', 'z']) + test), [
+            ['A', 'B', '1'], ['B', 'A', '2'], ['A', 'A', '3']
+        ])
+        self.assertEqual((test.hits, test.misses), (4, 2))
+
+
+class DistinctTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        rows = [['a', '1'], ['b', '1'], ['a', '2'], ['a', '1']]
+        test = Rows(rows, ['k', 'v']) + operator.Distinct('k')
+        self.assertEqual(list(test), rows[:2])
+        test = Rows(rows, ['k', 'v']) + operator.Distinct(('k', 'v'))
+        self.assertEqual(list(test), rows[:3])
+
+
+class TopKTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        rows = [['a', '10'], ['b', '9'], ['c', '10'], ['d', '2']]
+        test = Rows(rows, ['k', 'v']) + \
+            operator.TopK(2, 'v', reverse=True, func=int)
+        self.assertEqual(list(test), [['a', '10'], ['c', '10']])
+        test = Rows(rows, ['k', 'v']) + operator.TopK(2, 'v')
+        self.assertEqual(list(test), [['a', '10'], ['c', '10']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from kisell.dsv import operator, parallel
+from tests import Rows
+
+
+class ExchangeTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        rows = [[str(i % 5), str(i)] for i in range(1000)]
+        test = Rows(rows, ['k', 'v']) + \
+            parallel.Exchange(operator.Distinct('k'), 'k', 2)
+        self.assertEqual(sorted(test), [[str(i), str(i)] for i in range(5)])
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from kisell.core import Origin
+from kisell.dsv import operator
+from kisell import fixedwidth
+
+
+class FixedWidthTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.name = os.path.join(self.tmpdir, 'test.txt')
+        self.layout = [('id', 4, int), (None, 1), ('name', 6),
+                       ('score', 5, float)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_parse(self):
+        lines = [u'0001 alice   1.5\n', u'0002 bob     2.0\n', u'0003 c']
+        test = Origin(lines) + fixedwidth.FixedWidthParse(
+            [('id', 4, int), (None, 1), ('name', 6)]
+        )
+        self.assertEqual(test.field, ['id', 'name'])
+        self.assertEqual(list(test), [[1, 'alice'], [2, 'bob'], [3, 'c']])
+        test = Origin([x.encode('utf-8') for x in lines[:2]]) + \
+            fixedwidth.FixedWidthParse(self.layout)
+        self.assertEqual(list(test), [[1, 'alice', 1.5], [2, 'bob', 2.0]])
+
+    def test_write_read(self):
+        records = [[1, 'alice', 1.5], [2, 'bob', 2.0]]
+        for _ in Origin(records) + \
+                fixedwidth.FixedWidthFileWriter(self.name, self.layout):
+            pass
+        with open(self.name) as f:
+            self.assertEqual(f.readline(), '1    alice 1.5  \n')
+        for binary in (False, True):
+            test = fixedwidth.FixedWidthFileReader(
+                self.name, self.layout, binary=binary
+            ) + operator.Filter(lambda x: x > 1.5, 'score')
+            self.assertEqual(list(test), records[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,18 +1,22 @@
-# -*- coding: utf-8 -*-
-
+# -*- coding: utf-8 -*-
+
 import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 
 from kisell.core import Pipe
-from kisell import io
-
-
-_license_file_path = os.path.join(
-    os.path.dirname(os.path.dirname(__file__)), 'LICENSE'
-)
-_license_file_content = None
-with open(_license_file_path, 'r') as f:
-    _license_file_content = f.read()
+from kisell import io, operator
+
+
+_license_file_path = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'LICENSE'
+)
+_license_file_content = None
+with open(_license_file_path, 'r') as f:
+    _license_file_content = f.read()
 
 
 class _AddLineNumber(Pipe):
@@ -40,12 +44,12 @@ class ReadStreamTester(unittest.TestCase):
         self.assertEqual(len(l[0]), 100)
 
 
-class FileReadStreamTester(unittest.TestCase):
-    def setUp(self):
-        pass
-
-    def tearDown(self):
-        pass
+class FileReadStreamTester(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
 
     def test__init__(self):
         test = io.FileReadStream(_license_file_path)
@@ -56,6 +60,76 @@ class FileReadStreamTester(unittest.TestCase):
         self.assertEqual(content, _license_file_content)
 
 
+class MultiFileReadStreamTester(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        test = io.MultiFileReadStream([_license_file_path] * 3,
+                                      readahead=1, batch_size=2)
+        self.assertEqual(''.join(test), _license_file_content * 3)
+        test = io.MultiFileReadStream(_license_file_path)
+        self.assertEqual(test.names, [_license_file_path])
+        self.assertEqual(
+            [name for (name, lines) in test.files() if len(list(lines))],
+            [_license_file_path]
+        )
+
+
+class FollowFileReadStreamTester(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.name = os.path.join(self.tmpdir, 'test.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def __follow(self, idle_timeout=0.1):
+        return io.FollowFileReadStream(self.name, poll_interval=0.01,
+                                       idle_timeout=idle_timeout)
+
+    def test__init__(self):
+        with open(self.name, 'w') as f:
+            f.write('a\nb\npar')
+        test = self.__follow()
+        self.assertEqual(list(test), ['a\n', 'b\n'])
+        self.assertEqual(test.offset, 4)
+        with open(self.name, 'a') as f:
+            f.write('tial\nc\n')
+        self.assertEqual(list(self.__follow()), ['partial\n', 'c\n'])
+        self.assertEqual(list(self.__follow()), [])
+        with open(self.name, 'w') as f:
+            f.write('x\n')
+        self.assertEqual(list(self.__follow()), ['x\n'])
+
+    def test_early_stop(self):
+        with open(self.name, 'w') as f:
+            f.write('a\nb\nc\nd\n')
+        test = self.__follow() + operator.Limit(2)
+        self.assertEqual(list(test), ['a\n', 'b\n'])
+        self.assertEqual(list(self.__follow()), ['c\n', 'd\n'])
+
+    def test_rotation(self):
+        with open(self.name, 'w') as f:
+            f.write('a\n')
+
+        def rotate():
+            time.sleep(0.1)
+            with open(self.name, 'a') as f:
+                f.write('b\n')
+            os.rename(self.name, self.name + '.1')
+            with open(self.name, 'w') as f:
+                f.write('c\n')
+        t = threading.Thread(target=rotate)
+        t.start()
+        test = self.__follow(0.5)
+        self.assertEqual(list(test), ['a\n', 'b\n', 'c\n'])
+        t.join()
+
+
 class WriteStreamTester(unittest.TestCase):
 
     def setUp(self):
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from kisell.core import Origin
+from kisell.dsv import operator
+from kisell.jsonl import io
+
+
+class JSONLTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.name = os.path.join(self.tmpdir, 'test.jsonl')
+        self.records = [{'a': i, 'b': u'あ' * i} for i in range(20)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_parse(self):
+        lines = [u'{"a": 1, "b": [1, 2]}\n', u'\n', u'{"a": 2}\n']
+        test = Origin(lines) + io.JSONLParse(batch_size=2)
+        self.assertEqual(list(test), [{'a': 1, 'b': [1, 2]}, {'a': 2}])
+        test = Origin(lines) + io.JSONLParse(['b', 'a'])
+        self.assertEqual(test.field, ['b', 'a'])
+        self.assertEqual(list(test), [[[1, 2], 1], [None, 2]])
+        for lines in ([u'{"a": 1}\n', u'{"a"\n'], [u'1,2\n'],
+                      [u'{"a":1}, {"a":2}\n'],
+                      [u'[{"a":1}\n', u'{"a":2}]\n'],
+                      [u'[1\n', u'2]\n', u'3,4\n'],
+                      [b'{"a":1}, {"a":2}\n']):
+            with self.assertRaises(ValueError):
+                list(Origin(lines) + io.JSONLParse())
+
+    def test_format(self):
+        test = Origin([{'a': 1}]) + io.JSONLFormat()
+        self.assertEqual(list(test), [u'{"a":1}\n'])
+
+    def test_write_read(self):
+        for _ in Origin(self.records) + io.JSONLFileWriter(self.name, 7):
+            pass
+        self.assertEqual(list(io.JSONLFileReader(self.name, batch_size=3)),
+                         self.records)
+        test = io.JSONLFileReader(self.name, ['a'], 4, processes=2) + \
+            operator.Filter(lambda x: x % 2 == 0, 'a')
+        self.assertEqual(list(test), [[i] for i in range(0, 20, 2)])
+        name = os.path.join(self.tmpdir, 'projected.jsonl')
+        for _ in io.JSONLFileReader(self.name, ['b']) + \
+                io.JSONLFileWriter(name):
+            pass
+        self.assertEqual(list(io.JSONLFileReader(name)),
+                         [{'b': x['b']} for x in self.records])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import os
+import unittest
+
+from kisell.core import Origin
+from kisell import operator
+from kisell.io import FileReadStream
+from kisell.util import OnFinalize, OnIterate, Prefetch
+
+
+_license_file_path = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'LICENSE'
+)
+
+
+class LimitTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        self.assertEqual(list(Origin(range(10)) + operator.Limit(3)),
+                         [0, 1, 2])
+        self.assertEqual(list(Origin(range(2)) + operator.Limit(3)), [0, 1])
+        self.assertEqual(list(Origin(range(2)) + operator.Limit(0)), [])
+
+    def test_early_termination(self):
+        pulled = []
+        finalized = []
+        test = Origin(itertools.count()) + OnIterate(pulled.append) + \
+            OnFinalize(lambda: finalized.append(True)) + operator.Limit(3)
+        self.assertEqual(list(test), [0, 1, 2])
+        self.assertEqual(pulled, [0, 1, 2])
+        self.assertEqual(finalized, [True])
+        reader = FileReadStream(_license_file_path)
+        test = reader + Prefetch(2, 1) + operator.Limit(2)
+        self.assertEqual(len(list(test)), 2)
+        self.assertTrue(reader.closed)
+        reader = FileReadStream(_license_file_path)
+        it = iter(reader + operator.Skip(1))
+        next(it)
+        it.close()
+        self.assertTrue(reader.closed)
+
+
+class TeeTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        a = []
+        b = []
+        test = Origin(range(1000)) + operator.Tee(
+            OnIterate(a.append),
+            operator.Filter(lambda x: x % 3 == 0) + OnIterate(b.append),
+            buffer_size=2, batch_size=7
+        )
+        self.assertEqual(list(test), list(range(1000)))
+        self.assertEqual(a, list(range(1000)))
+        self.assertEqual(b, list(range(0, 1000, 3)))
+        with self.assertRaises(TypeError):
+            operator.Tee(OnIterate(a.append), buffer=1)
+
+    def test_branch_error(self):
+        def fail(x):
+            if x == 500:
+                raise ValueError(x)
+        test = Origin(range(1000)) + operator.Tee(OnIterate(fail),
+                                                  batch_size=10)
+        with self.assertRaises(ValueError):
+            test()
+
+    def test_early_stop(self):
+        a = []
+        test = Origin(range(1000)) + \
+            operator.Tee(OnIterate(a.append), batch_size=4) + \
+            operator.Limit(10)
+        self.assertEqual(list(test), list(range(10)))
+        self.assertEqual(a, list(range(10)))
+
+
+class MapTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        calls = []
+
+        def f(x):
+            calls.append(x)
+            return x * 2
+        test = operator.Map(f, memoize=2)
+        self.assertEqual(list(Origin([1, 2, 3, 1, 2, 3]) + test),
+                         [2, 4, 6, 2, 4, 6])
+        self.assertEqual(calls, [1, 2, 3, 3])
+        self.assertEqual((test.hits, test.misses), (2, 4))
+        test = operator.Map(lambda x, y: x + [y], [1, 1, 1], memoize=True)
+        self.assertEqual(list(Origin([[0], [0], [1]]) + test),
+                         [[0, 1], [0, 1], [1, 1]])
+        self.assertEqual((test.hits, test.misses), (0, 3))
+        test = operator.Map(abs)
+        self.assertEqual(list(Origin([-1, 1]) + test), [1, 1])
+        self.assertEqual((test.hits, test.misses), (0, 0))
+        with self.assertRaises(TypeError):
+            operator.Map(abs, memo=True)
+
+
+class SampleTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        res = list(Origin(range(100000)) + operator.Sample(0.1, seed=1))
+        self.assertEqual(res, sorted(set(res)))
+        self.assertTrue(9000 < len(res) < 11000)
+        self.assertEqual(
+            res, list(Origin(range(100000)) + operator.Sample(0.1, seed=1))
+        )
+        self.assertEqual(list(Origin(range(10)) + operator.Sample(1)),
+                         list(range(10)))
+        self.assertEqual(list(Origin(range(10)) + operator.Sample(0)), [])
+
+
+class ReservoirTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        res = list(Origin(range(100000)) + operator.Reservoir(100, seed=1))
+        self.assertEqual(len(res), 100)
+        self.assertEqual(res, sorted(set(res)))
+        self.assertEqual(
+            res, list(Origin(range(100000)) + operator.Reservoir(100, seed=1))
+        )
+        self.assertTrue(res[-1] > 50000)
+        self.assertEqual(list(Origin(range(5)) + operator.Reservoir(10)),
+                         list(range(5)))
+
+
+class TumblingWindowTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        self.assertEqual(
+            list(Origin(range(10)) + operator.TumblingWindow(4)), [6, 22, 17]
+        )
+        self.assertEqual(
+            list(Origin(range(10)) + operator.TumblingWindow(
+                4, ('min', 'max', 'count'))),
+            [(0, 3, 4), (4, 7, 4), (8, 9, 2)]
+        )
+        test = Origin([(1, 1), (2, 2), (6, 3), (14, 4)]) + \
+            operator.TumblingWindow(5, 'mean', key=lambda x: x[1],
+                                    timestamp=lambda x: x[0], origin=0)
+        self.assertEqual(list(test), [(0, 1.5), (5, 3.0), (10, 4.0)])
+        with self.assertRaises(ValueError):
+            operator.TumblingWindow(3, 'median')
+
+
+class SlidingWindowTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        values = [5, 1, 4, 1, 5, 9, 2, 6, 5, 3]
+        for (agg, f) in (('min', min), ('max', max)):
+            self.assertEqual(
+                list(Origin(values) + operator.SlidingWindow(3, agg)),
+                [f(values[max(0, i - 2):i + 1]) for i in range(len(values))]
+            )
+        self.assertEqual(
+            list(Origin(values) + operator.SlidingWindow(2, 'sum')),
+            [5, 6, 5, 5, 6, 14, 11, 8, 11, 8]
+        )
+        test = Origin([(0, 1), (1, 2), (2, 3), (5, 4)]) + \
+            operator.SlidingWindow(2, 'sum', key=lambda x: x[1],
+                                   timestamp=lambda x: x[0])
+        self.assertEqual(list(test), [(0, 1), (1, 3), (2, 5), (5, 4)])
+
+
+class DistinctTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        values = [i % 1000 for i in range(3000)]
+        test = operator.Distinct(memory_limit=100)
+        self.assertEqual(list(Origin(values) + test), list(range(1000)))
+        self.assertEqual(test.duplicates, 2000)
+        test = operator.Distinct(key=lambda x: x % 10, mode='bloom',
+                                 capacity=100)
+        self.assertEqual(list(Origin(values) + test), list(range(10)))
+        with self.assertRaises(ValueError):
+            operator.Distinct(mode='approx')
+
+    def test_spill(self):
+        hashes = operator._SpillingHashSet(10, partitions=2, fanout=2)
+        try:
+            self.assertEqual(
+                sum(hashes.add(h) for h in range(0, 1 << 64, 1 << 56)), 256
+            )
+            self.assertFalse(any(hashes.add(h)
+                                 for h in range(0, 1 << 64, 1 << 56)))
+            self.assertTrue(hashes.add(1))
+        finally:
+            hashes.close()
+
+
+def _first(x):
+    return x[0]
+
+
+class TopKTester(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [(i * 7 % 10, i) for i in range(30)]
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        key = _first
+        for reverse in (False, True):
+            test = operator.TopK(5, key, reverse)
+            self.assertEqual(
+                list(Origin(self.records) + test),
+                sorted(self.records, key=key, reverse=reverse)[:5]
+            )
+            self.assertEqual(len(test.result), 5)
+        self.assertEqual(list(Origin([3, 1, 2]) + operator.TopK(0)), [])
+
+    def test_merge(self):
+        key = _first
+        parts = [operator.TopK(4, key, True) for _ in range(3)]
+        for (i, p) in enumerate(parts):
+            for _ in Origin(self.records[i * 10:(i + 1) * 10]) + p:
+                pass
+        self.assertEqual(parts[0].merge(*parts[1:]),
+                         sorted(self.records, key=key, reverse=True)[:4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from kisell import operator, parallel
+from kisell.core import Origin
+from kisell.dsv.io import CSVFileReader
+from kisell.util import Count, OnFinalize, OnInitialize, Template
+
+
+class RunParallelTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.names = []
+        for n in range(5):
+            name = os.path.join(self.tmpdir, '{}.csv'.format(n))
+            with open(name, 'w') as f:
+                f.write('a,b\n')
+                for i in range(n * 10):
+                    f.write('{},{}\n'.format(i, i * 2))
+            self.names.append(name)
+        self.template = Template(
+            CSVFileReader,
+            lambda name: operator.Filter(lambda x: int(x[0]) % 2 == 0),
+            lambda name: Count()
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_template(self):
+        self.assertEqual(self.template(self.names[2]).count, 10)
+        self.assertEqual(self.template(self.names[3]).count, 15)
+
+    def test_run_parallel(self):
+        self.assertEqual(parallel.run_parallel(self.template, self.names, 2),
+                         [0, 5, 10, 15, 20])
+        self.assertEqual(
+            parallel.run_parallel(self.template, self.names, 1,
+                                  lambda p: p().field),
+            [['a', 'b']] * 5
+        )
+
+
+class ProcessBoundaryTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_process_boundary(self):
+        pipeline = parallel.pipelined(
+            [Origin(range(10000)), operator.Map(lambda x: x * x)],
+            operator.Filter(lambda x: x % 3 == 0),
+            batch_size=100, slots=4
+        )
+        self.assertEqual(list(pipeline),
+                         [x * x for x in range(10000) if x * x % 3 == 0])
+
+    def test_hooks(self):
+        tmpdir = tempfile.mkdtemp()
+        name = os.path.join(tmpdir, 'log')
+
+        def log(event):
+            def f():
+                with open(name, 'a') as g:
+                    g.write('{} {}\n'.format(event, os.getpid()))
+            return f
+        try:
+            pipeline = Origin(range(5)) + OnInitialize(log('init')) + \
+                OnFinalize(log('final')) + parallel.ProcessBoundary()
+            self.assertEqual(list(pipeline), list(range(5)))
+            with open(name) as f:
+                events = [x.split() for x in f]
+            self.assertEqual([e for (e, _) in events], ['init', 'final'])
+            self.assertEqual(events[0][1], events[1][1])
+            self.assertNotEqual(events[0][1], str(os.getpid()))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_field(self):
+        tmpdir = tempfile.mkdtemp()
+        name = os.path.join(tmpdir, 'test.csv')
+        with open(name, 'w') as f:
+            f.write('a,b\n1,2\n3,4\n')
+        try:
+            reader = CSVFileReader(name)
+            pipeline = reader + parallel.ProcessBoundary()
+            self.assertEqual(pipeline.field, ['a', 'b'])
+            self.assertEqual(list(pipeline), [['1', '2'], ['3', '4']])
+            pipeline = Origin(range(3)) + parallel.ProcessBoundary()
+            self.assertFalse(hasattr(pipeline, 'field'))
+            self.assertEqual(list(pipeline), [0, 1, 2])
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_large_records(self):
+        records = [('x' * 1000, i) for i in range(50)] + [set([1])]
+        pipeline = Origin(records) + \
+            parallel.ProcessBoundary(batch_size=7, slots=2, slot_size=256)
+        self.assertEqual(list(pipeline), records)
+
+    def test_error(self):
+        def f(x):
+            if x == 500:
+                raise ValueError(x)
+            return x
+        pipeline = Origin(range(1000)) + operator.Map(f) + \
+            parallel.ProcessBoundary(batch_size=10)
+        self.assertRaises(ValueError, list, pipeline)
+
+    def test_limit(self):
+        pipeline = Origin(iter(int, 1)) + parallel.ProcessBoundary() + \
+            operator.Limit(5)
+        self.assertEqual(list(pipeline), [0] * 5)
+
+
+class ExchangeTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_exchange(self):
+        records = [(i % 7, i) for i in range(5000)]
+        pipeline = Origin(records) + parallel.Exchange(
+            operator.Distinct(lambda x: x[0]), lambda x: x[0], 3,
+            batch_size=50
+        )
+        self.assertEqual(sorted(pipeline), [(i, i) for i in range(7)])
+
+    def test_empty(self):
+        pipeline = Origin([]) + parallel.Exchange(operator.Map(str), None, 2)
+        self.assertEqual(list(pipeline), [])
+
+    def test_error(self):
+        pipeline = Origin(range(100)) + parallel.Exchange(
+            operator.Map(lambda x: 1 // (x - 50)), None, 2, batch_size=5
+        )
+        self.assertRaises(ZeroDivisionError, list, pipeline)
+
+    def test_limit(self):
+        pipeline = Origin(iter(int, 1)) + parallel.Exchange(
+            operator.Map(lambda x: x + 1), None, 2
+        ) + operator.Limit(3)
+        self.assertEqual(list(pipeline), [1] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
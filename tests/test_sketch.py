@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+
+from kisell import sketch
+from kisell.dsv import operator
+from tests import Rows
+
+
+class HyperLogLogTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        a = sketch.HyperLogLog(12)
+        a.update(range(50000))
+        self.assertTrue(abs(a.count - 50000) < 2500)
+        b = sketch.HyperLogLog(12)
+        b.update(range(25000, 75000))
+        self.assertTrue(abs(a.merge(b).count - 75000) < 3750)
+        c = sketch.HyperLogLog()
+        c.update(['a', 'b', 'a'])
+        self.assertEqual(c.count, 2)
+
+
+class SpaceSavingTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        rng = random.Random(0)
+        values = [rng.randrange(1000) for _ in range(20000)] + \
+            [-1] * 3000 + [-2] * 2000
+        rng.shuffle(values)
+        a = sketch.SpaceSaving(20)
+        a.update(values[:10000])
+        b = sketch.SpaceSaving(20)
+        b.update(values[10000:])
+        self.assertEqual([v for (v, _) in a.merge(b).top(2)], [-1, -2])
+        self.assertTrue(a.counts[-1] >= 3000)
+
+
+class KLLTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        values = list(range(100000))
+        random.Random(0).shuffle(values)
+        a = sketch.KLL(seed=0)
+        a.update(values[:50000])
+        b = sketch.KLL(seed=1)
+        b.update(values[50000:])
+        a.merge(b)
+        self.assertEqual(a.n, 100000)
+        self.assertTrue(abs(a.quantile(0.5) - 50000) < 2000)
+        self.assertTrue(abs(a.quantile(0.9) - 90000) < 2000)
+        self.assertIsNone(sketch.KLL().quantile(0.5))
+
+
+class SketchPipeTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        rows = [['x' if i % 2 else str(i % 7), str(i)] for i in range(1001)]
+        dc = operator.DistinctCount('k')
+        hh = operator.HeavyHitters('k', 3)
+        qs = operator.Quantiles('v', (0.5,), seed=0)
+        test = Rows(rows, ['k', 'v']) + dc + hh + qs
+        self.assertEqual(list(test), rows)
+        self.assertEqual(dc.distinct_count, 8)
+        self.assertEqual(hh.heavy_hitters[0][0], 'x')
+        self.assertTrue(hh.heavy_hitters[0][1] >= 500)
+        self.assertEqual(list(qs.quantiles), [0.5])
+        self.assertTrue(abs(qs.quantile(0.5) - 500.0) < 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from kisell.dsv import operator
+from kisell import sqlite
+from tests import Rows
+
+
+class SQLiteTester(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.name = os.path.join(self.tmpdir, 'test.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_writer(self):
+        rows = [[i, 'v{}'.format(i)] for i in range(25)]
+        writer = sqlite.SQLiteWriter(self.name, 'my table', 10,
+                                     {'journal_mode': 'WAL'})
+        for _ in Rows(rows, ['id', 'value']) + writer:
+            pass
+        con = sqlite3.connect(self.name)
+        self.assertEqual(
+            [list(x) for x in con.execute('SELECT * FROM "my table"')], rows
+        )
+        con.close()
+
+    def test_origin(self):
+        con = sqlite3.connect(self.name)
+        con.execute('CREATE TABLE t (k, v)')
+        con.executemany('INSERT INTO t VALUES (?, ?)',
+                        [('a', 1), ('b', 2), ('c', 3)])
+        con.commit()
+        test = sqlite.SQLiteOrigin(con, 't', batch_size=2)
+        self.assertEqual(test.field, ['k', 'v'])
+        self.assertEqual(list(test), [['a', 1], ['b', 2], ['c', 3]])
+        test = sqlite.SQLiteOrigin(self.name, 'SELECT v, k FROM t WHERE v > ?',
+                                   (1,)) + operator.Map(str.upper, 'k')
+        self.assertEqual(list(test), [[2, 'B'], [3, 'C']])
+        con.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
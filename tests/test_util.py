@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+
+from kisell.core import Origin
+from kisell.dsv.io import CSVFileReader
+from kisell import util
+
+
+def _fail(x):
+    if x == 300:
+        raise ValueError(x)
+
+
+class PrefetchTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        for process in (False, True):
+            test = Origin(range(1000)) + util.Prefetch(2, 16, process)
+            self.assertEqual(list(test), list(range(1000)))
+
+    def test_error(self):
+        for process in (False, True):
+            test = Origin(range(1000)) + util.OnIterate(_fail) + \
+                util.Prefetch(2, 16, process)
+            with self.assertRaises(ValueError):
+                list(test)
+
+    def test_early_stop(self):
+        for process in (False, True):
+            test = Origin(itertools.count()) + util.Prefetch(2, 16, process)
+            it = iter(test)
+            self.assertEqual(list(itertools.islice(it, 5)), list(range(5)))
+            it.close()
+
+    def test_process(self):
+        tmpdir = tempfile.mkdtemp()
+        name = os.path.join(tmpdir, 'log')
+
+        def log(event):
+            def f():
+                with open(name, 'a') as g:
+                    g.write('{} {}\n'.format(event, os.getpid()))
+            return f
+        try:
+            test = Origin(range(5)) + util.OnInitialize(log('init')) + \
+                util.OnFinalize(log('final')) + util.Prefetch(2, 2, True)
+            self.assertEqual(list(test), list(range(5)))
+            with open(name) as f:
+                events = [x.split() for x in f]
+            self.assertEqual([e for (e, _) in events], ['init', 'final'])
+            self.assertEqual(events[0][1], events[1][1])
+            self.assertNotEqual(events[0][1], str(os.getpid()))
+            csv = os.path.join(tmpdir, 'test.csv')
+            with open(csv, 'w') as f:
+                f.write('a,b\n1,2\n')
+            test = CSVFileReader(csv) + util.Prefetch(2, 2, True)
+            self.assertEqual(test.field, ['a', 'b'])
+            self.assertEqual(list(test), [['1', '2']])
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main()
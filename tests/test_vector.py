@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from kisell.core import Origin
+from tests import Rows
+
+try:
+    import numpy
+    from kisell import vector
+    from kisell.dsv import vector as dsv_vector
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class VectorMapTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        test = Origin(range(10)) + vector.VectorMap(lambda a: a * 2, 3)
+        self.assertEqual(list(test), [x * 2 for x in range(10)])
+        test = Origin(range(10)) + \
+            vector.VectorMap(numpy.sum, 4, unbatch=False)
+        self.assertEqual(list(test), [6, 22, 17])
+
+    def test_dsv(self):
+        rows = [['a', '1'], ['b', '2'], ['c', '3']]
+        test = Rows(rows, ['k', 'v']) + \
+            dsv_vector.VectorMap(numpy.sqrt, 'v', 2, float)
+        self.assertEqual(list(test), [
+            ['a', 1.0], ['b', 2.0 ** 0.5], ['c', 3.0 ** 0.5]
+        ])
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class VectorFilterTester(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test__init__(self):
+        test = Origin(range(10)) + vector.VectorFilter(lambda a: a % 3 == 0, 4)
+        self.assertEqual(list(test), [0, 3, 6, 9])
+
+    def test_dsv(self):
+        rows = [['a', '1', '5'], ['b', '2', '1'], ['c', '3', '4']]
+        test = Rows(rows, ['k', 'x', 'y']) + \
+            dsv_vector.VectorFilter(lambda a: a > 1.5, ('x', 'y'), 2)
+        self.assertEqual(list(test), [rows[2]])
+
+
+if __name__ == '__main__':
+    unittest.main()